@@ -1,16 +1,25 @@
-import pandas as pd
 import os
 
+import numpy as np
+
+from bootstrap import bootstrap_table
+from counts import (
+    load_counts, week_type_counts, weekday_counts, weekday_table, DAYS, WEEK_TYPES, WEEKDAYS,
+)
+from profiling import stage
+import stage_cache
+
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV = "results.csv"   # your weekly summary with columns: 
-                            # Week_Start, Bull_Bear, High_Day, Low_Day
+INPUT_NPZ = "weekly_counts.npz"   # count store written by sp500.py / incremental.py
+                                  # (week type × extreme × weekday × session × hour)
 # ─────────────────────────────────────────────────────────────────────────────
 
 # 1. LOAD
-df = pd.read_csv(INPUT_CSV)
+with stage("1. load counts"):
+    store = load_counts(INPUT_NPZ)
 
 # 2. OVERALL BULL/BEAR PCT
-counts = df['Bull_Bear'].value_counts()
+counts = week_type_counts(store)
 total  = counts.sum()
 pct = (counts / total * 100).round(2)
 print("Overall distribution of weeks:")
@@ -19,12 +28,10 @@ for wb in ['Bullish','Bearish']:
 print()
 
 # 3. CONDITIONAL PROBS FOR LOW_DAY
-days = ['Monday','Tuesday','Wednesday','Thursday','Friday']
-low_cond = {}
-for wb in ['Bullish','Bearish']:
-    sub = df[df['Bull_Bear'] == wb]
-    vc  = sub['Low_Day'].value_counts(normalize=True) * 100
-    low_cond[wb] = vc.reindex(days, fill_value=0).round(2)
+days = DAYS
+with stage("3. low-day table"):
+    low_df = weekday_table(store, "Low", days)
+    low_cond = low_df.T
 
 # 4. DISPLAY LOW_DAY TABLE
 os.system("cls")
@@ -38,16 +45,12 @@ for wb in ['Bullish','Bearish']:
 print()
 
 # 5. OPTIONAL: save low-day distribution
-low_df = pd.DataFrame(low_cond).T
-low_df.index.name = 'Week_Type'
 low_df.to_csv("low_day_distribution_by_week_type.csv")
 
 # 6. CONDITIONAL PROBS FOR HIGH_DAY
-high_cond = {}
-for wb in ['Bullish','Bearish']:
-    sub = df[df['Bull_Bear'] == wb]
-    vc  = sub['High_Day'].value_counts(normalize=True) * 100
-    high_cond[wb] = vc.reindex(days, fill_value=0).round(2)
+with stage("6. high-day table"):
+    high_df = weekday_table(store, "High", days)
+    high_cond = high_df.T
 
 # 7. DISPLAY HIGH_DAY TABLE
 print("\nChance the weekly HIGH formed on each weekday:")
@@ -60,6 +63,14 @@ for wb in ['Bullish','Bearish']:
 print()
 
 # 8. OPTIONAL: save high-day distribution
-high_df = pd.DataFrame(high_cond).T
-high_df.index.name = 'Week_Type'
-high_df.to_csv("high_day_distribution_by_week_type.csv")
\ No newline at end of file
+high_df.to_csv("high_day_distribution_by_week_type.csv")
+
+# 9. BOOTSTRAP CIs and shuffled-calendar null band for both tables
+#    (cached by the counts they resample, so re-runs on unchanged weeks skip them)
+for extreme, out in [("Low",  "low_day_distribution_by_week_type_ci.csv"),
+                     ("High", "high_day_distribution_by_week_type_ci.csv")]:
+    with stage(f"9. bootstrap {extreme.lower()}-day CIs"):
+        cells = np.stack([weekday_counts(store, wb, extreme) for wb in WEEK_TYPES])
+        ci = stage_cache.node("weekday_ci", bootstrap_table, cells, WEEK_TYPES, WEEKDAYS).value
+        ci[ci["Category"].isin(days)].to_csv(out, index=False)
+    print(f"Saved → {out}")
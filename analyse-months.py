@@ -1,8 +1,16 @@
+import numpy as np
 import pandas as pd
 import os
+import sys
+
+from bootstrap import bootstrap_table, table_from_codes
+from calendar_fields import WEEKDAYS, calendar_fields
+from profiling import stage
+import stage_cache
+from timeframes import cached_timeframes
 
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV = "sp500.csv"  # adjust filename as needed
+INPUT_CSV = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"  # adjust filename as needed
 DELIM     = ";"                      # semicolon‐delimited
 # ───────────────────────────────────────────────────────────────────────────────
 
@@ -10,69 +18,29 @@ DELIM     = ";"                      # semicolon‐delimited
 if not os.path.exists(INPUT_CSV):
     print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
 else:
-    # 1. LOAD as strings for flexible date parsing
-    df = pd.read_csv(
-        INPUT_CSV,
-        sep=DELIM,
-        header=None,
-        names=["DateTime", "Open", "High", "Low", "Close", "Volume"],
-        dtype={"DateTime": str},
-    )
-
-    # 2. PARSE dates flexibly: try datetime with time, else date-only
-    dt_parsed = pd.to_datetime(df["DateTime"], format="%Y%m%d %H%M%S", errors="coerce")
-    mask = dt_parsed.isna()
-    if mask.any():
-        dt_parsed_date = pd.to_datetime(df.loc[mask, "DateTime"], format="%Y%m%d", errors="coerce")
-        dt_parsed.loc[mask] = dt_parsed_date
-    mask2 = dt_parsed.isna()
-    if mask2.any():
-        dt_parsed_generic = pd.to_datetime(df.loc[mask2, "DateTime"], infer_datetime_format=True, errors="coerce")
-        dt_parsed.loc[mask2] = dt_parsed_generic
-    df["DateTime"] = dt_parsed
-    df = df.dropna(subset=["DateTime"]).copy()
-
-    # 3. Timezone/localization if 1m data in UTC; adjust as needed
-    # Detect if times include non-midnight: if any time != 00:00:00, assume intraday UTC
-    try:
-        has_time = (df["DateTime"].dt.time != pd.to_datetime("00:00").time()).any()
-    except Exception:
-        has_time = False
-    if has_time:
-        df["DateTime"] = df["DateTime"].dt.tz_localize("UTC").dt.tz_convert("America/New_York")
-    else:
-        # Daily data: convert to Eastern at midnight
-        df["DateTime"] = df["DateTime"].dt.tz_localize("UTC").dt.tz_convert("America/New_York")
+    # 1. LOAD (parsed once, then served from the bar cache)
+    # 2. PARSE dates: `YYYYMMDD HHMMSS` or `YYYYMMDD`; unparseable rows are dropped
+    # 3. Timezone: bars are stored in UTC (daily bars at midnight); Eastern
+    #    calendar fields are derived from the int64 timestamps
+    # 4. Roll bars up to days and days up to months, carrying Low_TS along
+    #    (steps 1-4 come from the stage cache while input, config and code are unchanged)
+    with stage("1-4. monthly extremes") as st:
+        monthly = cached_timeframes(INPUT_CSV, delim=DELIM).value["Month"]
+        bullish = (monthly["Close"] > monthly["Open"]).to_numpy()
 
-    df = df.set_index("DateTime").sort_index()
-
-    # 4. Add Month period and compute Low_TS per month
-    df["Month"] = df.index.to_period("M")
-    def analyze_month(month_df):
-        open_price = month_df["Open"].iloc[0]
-        close_price = month_df["Close"].iloc[-1]
-        bullish = close_price > open_price
-        if not bullish:
-            return pd.Series({
-                "Bullish": False,
-                "Low_TS": pd.NaT,
-            })
-        low_ts = month_df["Low"].idxmin()
-        return pd.Series({
-            "Bullish": True,
-            "Low_TS": low_ts,
-        })
-
-    monthly = df.groupby("Month").apply(analyze_month)
+        # Week number and weekday of each low (labels only attached for printing)
+        low_cal = calendar_fields(monthly["Low_TS"])
+        low_weeknum = (low_cal["day_of_month"].astype(np.int64) - 1) // 7 + 1
+        st.rows_out = len(monthly)
 
     # Drop non-bullish months
-    bullish_months = monthly[monthly["Bullish"]].dropna(subset=["Low_TS"]).copy()
+    bullish_months = pd.DataFrame({
+        "Low_WeekNum": low_weeknum[bullish],
+        "Low_Weekday": np.take(WEEKDAYS, low_cal["weekday"][bullish]),
+    }, index=monthly.index[bullish])
     if bullish_months.empty:
         print("No bullish months found in data.")
     else:
-        # Compute week number and weekday for each low timestamp
-        bullish_months["Low_WeekNum"] = (bullish_months["Low_TS"].dt.day - 1) // 7 + 1
-        bullish_months["Low_Weekday"] = bullish_months["Low_TS"].dt.day_name()
 
         # 5. Overall percentage for each week number
         total_bull = len(bullish_months)
@@ -107,3 +75,12 @@ else:
         out_df = pd.DataFrame(records)
         out_df.to_csv("monthly_low_week_and_weekday_distribution_bullish.csv", index=False)
         print("\nSaved → monthly_low_week_and_weekday_distribution_bullish.csv")
+
+        # 8. Bootstrap CIs for the week-of-month table, with a null band from
+        #    shuffling which months count as bullish
+        with stage("8. bootstrap CIs", rows_in=len(monthly)):
+            weeks = table_from_codes(np.where(bullish, 0, 1), low_weeknum - 1, 2, 5)
+            ci = stage_cache.node("monthly_week_ci", bootstrap_table, weeks, ["Bullish", "Bearish"],
+                                  [f"Week {w}" for w in range(1, 6)]).value
+            ci.to_csv("monthly_low_week_distribution_ci.csv", index=False)
+        print("Saved → monthly_low_week_distribution_ci.csv")
@@ -1,8 +1,16 @@
+import numpy as np
 import pandas as pd
 import os
+import sys
+
+from bootstrap import bootstrap_table, table_from_codes
+from calendar_fields import MONTHS, NAT, calendar_fields
+from profiling import stage
+import stage_cache
+from timeframes import cached_timeframes
 
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV = "sp500.csv"  # adjust filename as needed
+INPUT_CSV = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"  # adjust filename as needed
 DELIM     = ";"                      # semicolon‐delimited
 # ───────────────────────────────────────────────────────────────────────────────
 
@@ -10,65 +18,28 @@ DELIM     = ";"                      # semicolon‐delimited
 if not os.path.exists(INPUT_CSV):
     print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
 else:
-    # 1. LOAD as strings for flexible date parsing
-    df = pd.read_csv(
-        INPUT_CSV,
-        sep=DELIM,
-        header=None,
-        names=["DateTime", "Open", "High", "Low", "Close", "Volume"],
-        dtype={"DateTime": str},
-    )
-
-    # 2. PARSE dates flexibly: try datetime with time, else date-only
-    dt_parsed = pd.to_datetime(df["DateTime"], format="%Y%m%d %H%M%S", errors="coerce")
-    mask = dt_parsed.isna()
-    if mask.any():
-        dt_parsed_date = pd.to_datetime(df.loc[mask, "DateTime"], format="%Y%m%d", errors="coerce")
-        dt_parsed.loc[mask] = dt_parsed_date
-    mask2 = dt_parsed.isna()
-    if mask2.any():
-        dt_parsed_generic = pd.to_datetime(df.loc[mask2, "DateTime"], infer_datetime_format=True, errors="coerce")
-        dt_parsed.loc[mask2] = dt_parsed_generic
-    df["DateTime"] = dt_parsed
-    df = df.dropna(subset=["DateTime"]).copy()
-
-    # 3. Timezone/localization if 1m data in UTC; adjust as needed
-    # Detect if times include non-midnight: if any time != 00:00:00, assume intraday UTC
-    try:
-        has_time = (df["DateTime"].dt.time != pd.to_datetime("00:00").time()).any()
-    except Exception:
-        has_time = False
-    if has_time:
-        df["DateTime"] = df["DateTime"].dt.tz_localize("UTC").dt.tz_convert("America/New_York")
-    else:
-        # Daily data: convert to Eastern at midnight
-        df["DateTime"] = df["DateTime"].dt.tz_localize("UTC").dt.tz_convert("America/New_York")
-
-    df = df.set_index("DateTime").sort_index()
-
-    # 4. Add Year period
-    df["Year"] = df.index.to_period("Y")
-
-    # 5. Analyze each year: determine bullish, low timestamp
-    def analyze_year(year_df):
-        open_price = year_df["Open"].iloc[0]
-        close_price = year_df["Close"].iloc[-1]
-        bullish = close_price > open_price
-        low_ts = year_df["Low"].idxmin()
-        return pd.Series({
-            "Bullish": bullish,
-            "Low_TS": low_ts
-        })
-
-    yearly = df.groupby("Year").apply(analyze_year)
-
-    # Drop years without data or NaT lows
-    yearly = yearly.dropna(subset=["Low_TS"])
-
-    # 6. Compute month and quarter for low TS
-    yearly["Low_Month"] = yearly["Low_TS"].dt.month_name()
-    yearly["Low_Month_Num"] = yearly["Low_TS"].dt.month
-    yearly["Low_Quarter"] = yearly["Low_TS"].dt.quarter
+    # 1. LOAD (parsed once, then served from the bar cache)
+    # 2. PARSE dates: `YYYYMMDD HHMMSS` or `YYYYMMDD`; unparseable rows are dropped
+    # 3. Timezone: bars are stored in UTC (daily bars at midnight); Eastern
+    #    calendar fields are derived from the int64 timestamps
+    # 4. Roll bars up days → months → quarters → years
+    # 5. Per year: bullish flag and low timestamp (carried up from the bars)
+    #    (steps 1-5 come from the stage cache while input, config and code are unchanged)
+    with stage("1-6. yearly extremes") as st:
+        yearly = cached_timeframes(INPUT_CSV, delim=DELIM).value["Year"]
+
+        # Drop years without data or NaT lows
+        yearly = yearly[yearly["Low_TS"] != NAT]
+
+        # 6. Compute month and quarter for low TS
+        low_cal = calendar_fields(yearly["Low_TS"])
+        yearly = pd.DataFrame({
+            "Bullish": (yearly["Close"] > yearly["Open"]).to_numpy(),
+            "Low_Month": np.take(MONTHS, low_cal["month"].astype(np.int64) - 1),
+            "Low_Month_Num": low_cal["month"].astype(np.int64),
+            "Low_Quarter": low_cal["quarter"].astype(np.int64),
+        }, index=yearly.index)
+        st.rows_out = len(yearly)
 
     # 7. Filter bullish years
     bullish_years = yearly[yearly["Bullish"]].copy()
@@ -104,3 +75,18 @@ else:
         out_quarter_df.to_csv("low_of_year_quarter_distribution_bullish.csv", index=False)
         print("\nSaved → low_of_year_month_distribution_bullish.csv")
         print("Saved → low_of_year_quarter_distribution_bullish.csv")
+
+        # 11. Bootstrap CIs for both tables, with a null band from shuffling
+        #     which years count as bullish
+        group = np.where(yearly["Bullish"].astype(bool), 0, 1)
+        for codes, n_cats, labels, out in [
+            (yearly["Low_Month_Num"] - 1, 12, [f"{m:02d}" for m in range(1, 13)],
+             "low_of_year_month_distribution_ci.csv"),
+            (yearly["Low_Quarter"] - 1, 4, [f"Q{q}" for q in range(1, 5)],
+             "low_of_year_quarter_distribution_ci.csv"),
+        ]:
+            with stage(f"11. bootstrap {out}", rows_in=len(yearly)):
+                table = table_from_codes(group, codes, 2, n_cats)
+                stage_cache.node("yearly_low_ci", bootstrap_table, table, ["Bullish", "Bearish"],
+                                 labels).value.to_csv(out, index=False)
+            print(f"Saved → {out}")
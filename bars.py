@@ -0,0 +1,219 @@
+import hashlib
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+COLUMNS      = ["DateTime", "Open", "High", "Low", "Close", "Volume"]
+PRICES       = ["Open", "High", "Low", "Close"]
+CACHE_DIR    = ".bars_cache"  # created next to each input file
+CACHE_VER    = 1              # bump when the on-disk layout changes
+PRICE_DTYPE  = np.float32     # compact loads: 4-byte prices (~7 significant digits)
+VOLUME_DTYPE = np.uint32      # compact loads: 4-byte volume
+TMP_MAX_AGE  = 6 * 3600       # seconds before an unfinished cache write is swept
+# ─────────────────────────────────────────────────────────────────────────────
+
+DAY_NS    = 86_400 * 10**9
+_POW_DATE = 10 ** np.arange(7, -1, -1, dtype=np.int64)    # YYYYMMDD
+_HMS_NS   = np.array([36_000, 3_600, 600, 60, 10, 1], dtype=np.int64) * 10**9
+NAT       = np.iinfo(np.int64).min
+
+
+def parse_datetime(values):
+    """
+    Parse `YYYYMMDD` / `YYYYMMDD HHMMSS` strings into int64 epoch nanoseconds.
+
+    The digits are read straight out of a fixed-width byte view, so the whole
+    column is converted with a handful of integer array operations. Rows that
+    do not fit the format fall back to pandas' generic parser (NaT if that
+    fails too).
+    """
+    raw = np.asarray(values, dtype="S16")
+    n = len(raw)
+    u = raw.view(np.uint8).reshape(n, 16)
+    digits = u.astype(np.int64) - 48
+
+    has_time = u[:, 8] == 32                          # "YYYYMMDD HHMMSS"
+    date_ok  = ((digits[:, :8] >= 0) & (digits[:, :8] <= 9)).all(axis=1)
+    time_ok  = ((digits[:, 9:15] >= 0) & (digits[:, 9:15] <= 9)).all(axis=1)
+    hh, mm, ss = (digits[:, i] * 10 + digits[:, i + 1] for i in (9, 11, 13))
+    time_ok &= (hh < 24) & (mm < 60) & (ss < 60)
+    valid    = date_ok & (u[:, 15] == 0) & np.where(has_time, time_ok, u[:, 8] == 0)
+
+    ymd = np.where(valid, digits[:, :8] @ _POW_DATE, 19700101)
+    y, m, d = ymd // 10_000, ymd // 100 % 100, ymd % 100
+    valid &= (m >= 1) & (m <= 12) & (d >= 1) & (d <= 31)
+    months = (y - 1970).astype("M8[Y]").astype("M8[M]") + np.where(valid, m - 1, 0)
+    days   = months.astype("M8[D]") + np.where(valid, d - 1, 0)
+    valid &= days.astype("M8[M]") == months           # rejects e.g. Feb 30
+
+    ns = days.astype(np.int64) * DAY_NS
+    ns += np.where(has_time & valid, digits[:, 9:15] @ _HMS_NS, 0)
+    ns[~valid] = NAT
+
+    if not valid.all():
+        bad = np.flatnonzero(~valid)
+        generic = pd.to_datetime(
+            pd.Series(np.asarray(values, dtype=object)[bad]).astype(str),
+            errors="coerce",
+            format="mixed",
+        )
+        ns[bad] = generic.to_numpy(dtype="M8[ns]").view(np.int64)
+    return ns
+
+
+def _to_columns(raw):
+    """Raw string/number frame → dict of column arrays (NaT rows dropped)."""
+    ns = parse_datetime(raw["DateTime"].to_numpy(dtype=object))
+    keep = ns != NAT
+    cols = {"DateTime": ns[keep]}
+    for c in PRICES:
+        cols[c] = raw[c].to_numpy(dtype=np.float64)[keep]
+    cols["Volume"] = raw["Volume"].to_numpy()[keep]
+    return cols
+
+
+def _compact_volume(v):
+    v = np.asarray(v)
+    if v.dtype.kind == "f":
+        v = np.nan_to_num(v)
+    return np.clip(v, 0, np.iinfo(VOLUME_DTYPE).max).astype(VOLUME_DTYPE)
+
+
+def _to_frame(cols, compact=False):
+    data = {"DateTime": np.asarray(cols["DateTime"]).view("M8[ns]")}
+    for c in PRICES:
+        data[c] = np.asarray(cols[c], dtype=PRICE_DTYPE if compact else None)
+    data["Volume"] = _compact_volume(cols["Volume"]) if compact else np.asarray(cols["Volume"])
+    return pd.DataFrame(data)
+
+
+def read_bars_csv(path, delim=";"):
+    """Parse a raw OHLCV file into a dict of column arrays (NaT rows dropped)."""
+    raw = pd.read_csv(
+        path,
+        sep=delim,
+        header=None,
+        names=COLUMNS,
+        dtype={"DateTime": str},
+    )
+    return _to_columns(raw)
+
+
+def _cache_path(path, delim, cache_dir):
+    """
+    Cache directory for one source: `<stem>-<path key>-<data key>`. The path
+    key separates same-named files in different folders; the data key
+    changes with the delimiter, size and mtime.
+    """
+    st = os.stat(path)
+    src = os.path.abspath(path)
+    path_key = hashlib.sha1(src.encode()).hexdigest()[:8]
+    ident = f"{CACHE_VER}|{src}|{delim}|{st.st_size}|{st.st_mtime_ns}"
+    key = hashlib.sha1(ident.encode()).hexdigest()[:16]
+    stem = f"{os.path.splitext(os.path.basename(path))[0]}-{path_key}"
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(src), CACHE_DIR)
+    return cache_dir, stem, os.path.join(cache_dir, f"{stem}-{key}")
+
+
+def _is_stale_tmp(path, now):
+    """Unfinished write left by a process that has exited, or one older than TMP_MAX_AGE."""
+    pid = path.rpartition(".tmp")[2]
+    if not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        if now - os.stat(path).st_mtime > TMP_MAX_AGE:
+            return True
+    except OSError:
+        return False                              # already published or swept
+    if os.name != "posix":
+        return False                              # os.kill would terminate, not probe
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass                                      # alive, owned by another user
+    return False
+
+
+def _write_cache(target, cache_dir, stem, cols):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{target}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for name, arr in cols.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), arr)
+    # drop stale entries for the same source, and writes that crashed
+    # half-way for any source, before publishing the new one
+    now = time.time()
+    for entry in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, entry)
+        if ".tmp" in entry:
+            if _is_stale_tmp(full, now):
+                shutil.rmtree(full, ignore_errors=True)
+        elif entry.startswith(f"{stem}-") and full != target:
+            shutil.rmtree(full, ignore_errors=True)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        if not os.path.isdir(target):
+            raise
+        shutil.rmtree(tmp, ignore_errors=True)    # a concurrent load published it first
+
+
+def _read_cache(target):
+    """Memory-mapped cached columns, or None if the entry is missing or vanished mid-read."""
+    try:
+        return {c: np.load(os.path.join(target, f"{c}.npy"), mmap_mode="r") for c in COLUMNS}
+    except (OSError, ValueError):
+        return None
+
+
+def load_bars(path, delim=";", cache_dir=None, use_cache=True, compact=False):
+    """
+    Load a `;`-delimited OHLCV file as a DataFrame with a datetime64[ns]
+    `DateTime` column (naive, as stored in the file) plus OHLCV columns.
+
+    The first load parses the CSV and writes one `.npy` array per column to
+    `CACHE_DIR`, keyed by the source path, size and mtime. Later loads
+    memory-map those arrays instead of re-parsing the text (and fall back
+    to the text if the entry disappears under them).
+
+    `compact=True` returns PRICE_DTYPE prices and VOLUME_DTYPE volume
+    (28 instead of 48 bytes per bar, timestamp included); the cache itself
+    stays full precision.
+    """
+    if use_cache:
+        cache_dir, stem, target = _cache_path(path, delim, cache_dir)
+        cols = _read_cache(target) if os.path.isdir(target) else None
+        if cols is None:
+            cols = read_bars_csv(path, delim)
+            try:
+                _write_cache(target, cache_dir, stem, cols)
+            except OSError:
+                pass    # read-only location: just skip caching
+    else:
+        cols = read_bars_csv(path, delim)
+
+    return _to_frame(cols, compact)
+
+
+def iter_bars(path, delim=";", chunk_rows=1_000_000, compact=False):
+    """
+    Yield the file as DataFrames of at most `chunk_rows` bars (same columns
+    as `load_bars`), so files larger than memory can be folded chunk by chunk.
+    """
+    reader = pd.read_csv(
+        path,
+        sep=delim,
+        header=None,
+        names=COLUMNS,
+        dtype={"DateTime": str},
+        chunksize=chunk_rows,
+    )
+    for raw in reader:
+        yield _to_frame(_to_columns(raw), compact)
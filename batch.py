@@ -0,0 +1,173 @@
+import argparse
+import contextlib
+import glob
+import os
+import runpy
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from bars import DAY_NS, load_bars
+from counts import load_counts, merge_counts, save_counts
+import profiling
+from weekly import decode_results
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+OUTPUT_DIR  = "output data"                 # per-symbol folders go in here
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_CSV = "batch_summary.csv"           # one row per instrument
+
+# (script, which data it applies to: "any", "daily" or "intraday").
+# Order matters: analyse-days.py reads the results.csv written by sp500.py.
+ANALYSES = [
+    ("sp500.py",          "any"),
+    ("analyse-days.py",   "any"),
+    ("london.py",         "intraday"),
+    ("daily.py",          "intraday"),
+    ("inside.py",         "daily"),
+    ("analyse-months.py", "any"),
+    ("analyse-years.py",  "any"),
+    ("rolling.py",        "any"),
+]
+
+# per-symbol distribution tables stacked into cross-instrument files
+COMBINED = [
+    "low_day_distribution_by_week_type.csv",
+    "high_day_distribution_by_week_type.csv",
+]
+# per-symbol count stores summed into one cross-instrument store
+MERGED = ["weekly_counts.npz", "weekly_session_counts.npz"]
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def find_inputs(spec):
+    """A directory (all *.csv in it) or a glob pattern → sorted list of files."""
+    if os.path.isdir(spec):
+        spec = os.path.join(spec, "*.csv")
+    return sorted(p for p in glob.glob(spec) if os.path.isfile(p))
+
+
+def symbol_of(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def run_script(script, input_csv, out_dir):
+    """
+    Run one analysis script as `__main__` with `input_csv` as its argument and
+    `out_dir` as working directory, so its CSVs land there. Console output is
+    kept in `<out_dir>/<script>.txt`, and the stage profile (when enabled) in
+    `<out_dir>/<script>.trace.json`.
+    """
+    log_path = os.path.join(out_dir, os.path.splitext(script)[0] + ".txt")
+    old_argv, old_cwd = sys.argv, os.getcwd()
+    with open(log_path, "w", encoding="utf-8") as log, \
+         contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        sys.argv = [script, input_csv]
+        os.chdir(out_dir)
+        try:
+            runpy.run_path(os.path.join(SCRIPT_DIR, script), run_name="__main__")
+            return "ok"
+        except Exception as exc:
+            traceback.print_exc()
+            return f"failed: {type(exc).__name__}: {exc}"
+        finally:
+            profiling.flush(os.path.splitext(script)[0] + profiling.TRACE_EXT)
+            sys.argv = old_argv
+            os.chdir(old_cwd)
+
+
+def analyse_instrument(input_csv, out_root):
+    """Run every applicable analysis for one instrument; return its summary row."""
+    input_csv = os.path.abspath(input_csv)
+    symbol = symbol_of(input_csv)
+    out_dir = os.path.join(os.path.abspath(out_root), symbol)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # loading here also warms the bar cache the scripts read from
+    bars = load_bars(input_csv)
+    ns = bars["DateTime"].to_numpy().view(np.int64)
+    intraday = bool((ns % DAY_NS != 0).any())
+
+    row = {
+        "Symbol"   : symbol,
+        "Bars"     : len(bars),
+        "Start"    : bars["DateTime"].min(),
+        "End"      : bars["DateTime"].max(),
+        "Intraday" : intraday,
+    }
+    for script, applies_to in ANALYSES:
+        if applies_to == "any" or (applies_to == "intraday") == intraday:
+            row[script] = run_script(script, input_csv, out_dir)
+        else:
+            row[script] = "skipped"
+
+    results = os.path.join(out_dir, "results.csv")
+    if os.path.exists(results):
+        weekly = decode_results(pd.read_csv(results))
+        row["Weeks"] = len(weekly)
+        row["Pct_Bullish_Weeks"] = round((weekly["Bull_Bear"] == "Bullish").mean() * 100, 2)
+    return row
+
+
+def combine(rows, out_root):
+    """Write the cross-instrument summary and stacked distribution tables."""
+    summary = pd.DataFrame(rows).sort_values("Symbol")
+    summary.to_csv(os.path.join(out_root, SUMMARY_CSV), index=False)
+
+    for name in COMBINED:
+        parts = []
+        for symbol in summary["Symbol"]:
+            path = os.path.join(out_root, symbol, name)
+            if os.path.exists(path):
+                parts.append(pd.read_csv(path).assign(Symbol=symbol))
+        if parts:
+            table = pd.concat(parts, ignore_index=True)
+            table = table[["Symbol"] + [c for c in table.columns if c != "Symbol"]]
+            table.to_csv(os.path.join(out_root, f"all_{name}"), index=False)
+
+    for name in MERGED:
+        paths = [os.path.join(out_root, s, name) for s in summary["Symbol"]]
+        stores = [load_counts(p) for p in paths if os.path.exists(p)]
+        if stores:
+            save_counts(os.path.join(out_root, f"all_{name}"), merge_counts(*stores))
+    return summary
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run every analysis over many instrument files.")
+    ap.add_argument("inputs", help="directory of instrument CSVs or a glob like 'data/*.csv'")
+    ap.add_argument("--out", default=OUTPUT_DIR, help=f"output root (default: {OUTPUT_DIR!r})")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    ap.add_argument("--profile", action="store_true", help="write a stage trace next to every script's output")
+    args = ap.parse_args(argv)
+    if args.profile:
+        profiling.enable()
+
+    files = find_inputs(args.inputs)
+    if not files:
+        print(f"No input files match '{args.inputs}'.")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(files)))) as pool:
+        futures = {pool.submit(analyse_instrument, f, args.out): f for f in files}
+        for fut in as_completed(futures):
+            try:
+                row = fut.result()
+            except Exception as exc:
+                row = {"Symbol": symbol_of(futures[fut]), "Error": f"{type(exc).__name__}: {exc}"}
+            rows.append(row)
+            print(f"  {row['Symbol']}: done")
+
+    summary = combine(rows, args.out)
+    print(f"\n{summary.to_string(index=False)}")
+    print(f"\nSaved → {os.path.join(args.out, SUMMARY_CSV)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from bars import CACHE_DIR, DAY_NS, load_bars, read_bars_csv
+from calendar_fields import calendar_fields
+from profiling import RssSampler
+from sessions import SESSIONS, session_codes
+from streaks import inside_outside_flags, streak_histogram, window_counts
+from timeframes import build_timeframes
+from weekly import weekly_extremes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+SIZES      = [10_000, 100_000, 1_000_000]   # rows per synthetic file
+KINDS      = ["minute", "daily"]
+WORK_DIR   = ".bench_data"                  # generated input files
+OUTPUT_CSV = "benchmark_results.csv"
+TZ         = "America/New_York"
+CHUNK      = 1_000_000                      # rows generated per write
+START      = {"minute": "2000-01-03",       # first bar; int64 ns end in 2262, so
+              "daily" : "1900-01-01"}       # daily bars start early (~94k rows max)
+# ─────────────────────────────────────────────────────────────────────────────
+
+MIN_NS = 60 * 10**9
+LAST_NS = pd.Timestamp("2261-12-31").value    # calendar lookups reach a year past the data
+
+
+# ── SYNTHETIC DATA ───────────────────────────────────────────────────────────
+def _digits(values, width):
+    """Zero-padded ASCII digits of non-negative ints as a (n, width) uint8 matrix."""
+    pow10 = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(values, dtype=np.int64)[:, None] // pow10 % 10 + 48).astype(np.uint8)
+
+
+def _char(n, c):
+    return np.full((n, 1), ord(c), dtype=np.uint8)
+
+
+def _price(cents):
+    """Fixed-width 'dddddd.dd' text for prices given in cents."""
+    n = len(cents)
+    return np.hstack([_digits(cents // 100, 6), _char(n, "."), _digits(cents % 100, 2)])
+
+
+def _timestamps(kind, start_ns, n):
+    """`n` bar times after `start_ns`: every minute Sun–Fri, or every weekday."""
+    step = MIN_NS if kind == "minute" else DAY_NS
+    # over-generate, then drop Saturdays (and Sundays for daily bars)
+    t = start_ns + step * np.arange(int(n * 1.5) + 8, dtype=np.int64)
+    weekday = (t // DAY_NS + 3) % 7                     # 1970-01-01 was a Thursday
+    keep = weekday != 5 if kind == "minute" else weekday < 5
+    return t[keep][:n]
+
+
+def _format_rows(ts, kind, o, h, l, c, v):
+    n = len(ts)
+    days = ts // DAY_NS
+    ymd = days.astype("M8[D]")
+    y = ymd.astype("M8[Y]").astype(np.int64) + 1970
+    m = ymd.astype("M8[M]").astype(np.int64) % 12 + 1
+    d = (ymd - ymd.astype("M8[M]")).astype(np.int64) + 1
+    parts = [_digits(y * 10_000 + m * 100 + d, 8)]
+    if kind == "minute":
+        sec = ts % DAY_NS // 10**9
+        hms = sec // 3600 * 10_000 + sec % 3600 // 60 * 100 + sec % 60
+        parts += [_char(n, " "), _digits(hms, 6)]
+    for col in (o, h, l, c):
+        parts += [_char(n, ";"), _price(col)]
+    parts += [_char(n, ";"), _digits(v, 7), _char(n, "\n")]
+    return np.hstack(parts).tobytes()
+
+
+def max_rows(kind):
+    """Most bars of `kind` that fit between START and the end of datetime64[ns]."""
+    step = MIN_NS if kind == "minute" else DAY_NS
+    weeks = (LAST_NS - pd.Timestamp(START[kind]).value) // step // 7 - 1
+    return int(weeks * (6 if kind == "minute" else 5))
+
+
+def make_bars(path, n, kind="minute", seed=0):
+    """
+    Write `n` synthetic OHLCV bars in the repo's `;`-delimited format
+    (`YYYYMMDD HHMMSS` for minute bars, `YYYYMMDD` for daily). Prices are a
+    random walk in cents; everything is formatted with integer array ops so
+    even 1e8-row files are written in bounded chunks.
+    """
+    rng = np.random.default_rng(seed)
+    if n > max_rows(kind):
+        raise ValueError(f"{n:,} {kind} bars run past {pd.Timestamp(LAST_NS).date()}; "
+                         f"at most {max_rows(kind):,} fit")
+    start = pd.Timestamp(START[kind]).value
+    close = 1_000_000                                   # 10000.00
+    step_ns = MIN_NS if kind == "minute" else DAY_NS
+    with open(path, "wb") as f:
+        done = 0
+        while done < n:
+            k = min(CHUNK, n - done)
+            ts = _timestamps(kind, start, k)
+            moves = rng.integers(-200, 201, size=k)
+            c = np.maximum(close + np.cumsum(moves), 100)
+            o = np.r_[close, c[:-1]]
+            h = np.maximum(o, c) + rng.integers(0, 150, size=k)
+            lo = np.maximum(np.minimum(o, c) - rng.integers(0, 150, size=k), 1)
+            v = rng.integers(1, 5_000, size=k)
+            f.write(_format_rows(ts, kind, o, h, lo, c, v))
+            close, start, done = int(c[-1]), int(ts[-1]) + step_ns, done + k
+
+
+def ensure_file(n, kind, work_dir):
+    os.makedirs(work_dir, exist_ok=True)
+    path = os.path.join(work_dir, f"synthetic_{kind}_{n}.csv")
+    if not os.path.exists(path):
+        make_bars(path, n, kind)
+    return path
+
+
+# ── MEASUREMENT ──────────────────────────────────────────────────────────────
+def measure(fn, rows):
+    """Run `fn()` once; return its result and wall/CPU time, throughput and RSS."""
+    sampler = RssSampler()
+    sampler.start()
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        result = fn()
+    finally:
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+        sampler.stop()
+    return result, {
+        "wall_s"       : round(wall, 6),
+        "cpu_s"        : round(cpu, 6),
+        "rows_per_s"   : round(rows / wall) if wall > 0 else float("nan"),
+        "peak_rss_mb"  : round(sampler.peak / 2**20, 1),
+        "rss_delta_mb" : round((sampler.peak - sampler.start_rss) / 2**20, 1),
+    }
+
+
+# ── STAGES ───────────────────────────────────────────────────────────────────
+def run_stages(path, n, kind):
+    """Time every pipeline stage in isolation on one synthetic file."""
+    records = []
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    shutil.rmtree(cache_dir, ignore_errors=True)      # first load must parse
+
+    def stage(name, fn, rows=n):
+        result, stats = measure(fn, rows)
+        records.append({"kind": kind, "rows": n, "stage": name, **stats})
+        return result
+
+    cols = stage("load/parse csv", lambda: read_bars_csv(path))
+    del cols
+    stage("load/parse + cache write", lambda: load_bars(path, cache_dir=cache_dir))
+    bars = stage("load (cache hit)", lambda: load_bars(path, cache_dir=cache_dir))
+
+    cal = stage("calendar fields", lambda: calendar_fields(bars["DateTime"], TZ))
+    stage("weekly aggregation", lambda: weekly_extremes(
+        bars["DateTime"], bars["Open"], bars["High"], bars["Low"], bars["Close"]))
+    stage("session tagging", lambda: session_codes(cal["minute"], SESSIONS))
+    inside, _ = stage("inside/outside flags",
+                      lambda: inside_outside_flags(bars["High"], bars["Low"]))
+    stage("run-length stats", lambda: window_counts(streak_histogram(inside)))
+    stage("month/year aggregation",
+          lambda: build_timeframes(bars.assign(Day=cal["day"])))
+    return records
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark every analysis stage on synthetic bars.")
+    ap.add_argument("--sizes", type=float, nargs="+",
+                    help=f"rows per file, e.g. 1e4 1e6 1e8 (default: {SIZES})")
+    ap.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS)
+    ap.add_argument("--work-dir", default=WORK_DIR)
+    ap.add_argument("--out", default=OUTPUT_CSV)
+    args = ap.parse_args(argv)
+
+    # sizes given on the command line must fit every kind asked for; default
+    # sizes a kind cannot hold are skipped instead
+    sizes = [int(s) for s in args.sizes or SIZES]
+    if args.sizes:
+        if any(n < 1 or n != s for n, s in zip(sizes, args.sizes)):
+            ap.error("--sizes must be positive whole row counts")
+        for kind in args.kinds:
+            too_big = [n for n in sizes if n > max_rows(kind)]
+            if too_big:
+                ap.error(f"{kind} bars are capped at {max_rows(kind):,} rows (datetime64[ns] "
+                         f"ends in 2262); got {too_big[0]:,}")
+
+    records = []
+    for kind in args.kinds:
+        for n in sizes:
+            if n > max_rows(kind):
+                print(f"  {kind:<6} {n:>12,} rows skipped (more than {max_rows(kind):,} fit)")
+                continue
+            path = ensure_file(n, kind, args.work_dir)
+            records += run_stages(path, n, kind)
+            print(f"  {kind:<6} {n:>12,} rows done")
+
+    results = pd.DataFrame(records)
+    results.to_csv(args.out, index=False)
+    print(f"\n{results.to_string(index=False)}")
+    print(f"\nSaved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+N_BOOT  = 5000      # resamples per table
+CI      = 0.95      # two-sided interval width
+SEED    = 0
+WORKERS = 1         # >1 splits the resamples over a forked process pool (Linux/macOS)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def table_from_codes(group_codes, cat_codes, n_groups, n_cats):
+    """(groups × categories) count table from per-period integer codes."""
+    flat = np.asarray(group_codes, dtype=np.intp) * n_cats + np.asarray(cat_codes, dtype=np.intp)
+    return np.bincount(flat, minlength=n_groups * n_cats).reshape(n_groups, n_cats)
+
+
+def _draw(counts, n_boot, seed):
+    """
+    `n_boot` bootstrap and null tables as (n_boot, G, K) share arrays.
+
+    Bootstrap: resampling a group's n periods with replacement is one
+    multinomial(n, p̂) draw, so all groups × resamples come from a single
+    batched call. Null: the group labels are shuffled across periods
+    (a shuffled calendar), i.e. each group draws its n periods without
+    replacement from the pooled periods — a multivariate hypergeometric.
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.asarray(counts, dtype=np.int64)
+    n = counts.sum(axis=1)
+    p = counts / np.maximum(n, 1)[:, None]
+    p[n == 0] = 1.0 / counts.shape[1]
+    boot = rng.multinomial(n, p, size=(n_boot, len(n)))
+
+    pooled = counts.sum(axis=0)
+    null = np.stack(
+        [rng.multivariate_hypergeometric(pooled, k, size=n_boot) for k in n], axis=1
+    )
+    denom = np.maximum(n, 1)[None, :, None]
+    return boot / denom, null / denom
+
+
+def resample(counts, n_boot=N_BOOT, seed=SEED, workers=WORKERS):
+    """
+    Bootstrap and null share arrays, optionally split across processes.
+    The pool always forks: the analysis scripts run at import time without a
+    `__main__` guard, so a spawned worker would re-run the whole script.
+    """
+    if workers <= 1:
+        return _draw(counts, n_boot, seed)
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError(f"workers={workers} needs the 'fork' start method, which this "
+                           f"platform lacks; set WORKERS = 1")
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = np.diff(np.linspace(0, n_boot, workers + 1).astype(int))
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("fork")) as pool:
+        parts = list(pool.map(_draw, [counts] * workers, sizes, seeds))
+    return (np.concatenate([b for b, _ in parts]),
+            np.concatenate([z for _, z in parts]))
+
+
+def bootstrap_table(counts, groups, categories, n_boot=N_BOOT, ci=CI, seed=SEED,
+                    workers=WORKERS):
+    """
+    Tidy table with, for every (group, category) cell: the count, the point
+    percentage, its bootstrap confidence interval and the interval the
+    percentage falls in when group labels carry no information.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    boot, null = resample(counts, n_boot, seed, workers)
+    q = [(1 - ci) / 2 * 100, (1 + ci) / 2 * 100]
+    b_lo, b_hi = np.percentile(boot * 100, q, axis=0)
+    z_lo, z_hi = np.percentile(null * 100, q, axis=0)
+    n = counts.sum(axis=1, keepdims=True)
+
+    g, k = np.indices(counts.shape)
+    return pd.DataFrame({
+        "Group"     : np.asarray(groups, dtype=object)[g.ravel()],
+        "Category"  : np.asarray(categories, dtype=object)[k.ravel()],
+        "Count"     : counts.ravel(),
+        "N"         : np.broadcast_to(n, counts.shape).ravel(),
+        "Pct"       : (counts / np.maximum(n, 1) * 100).ravel().round(2),
+        "CI_Low"    : b_lo.ravel().round(2),
+        "CI_High"   : b_hi.ravel().round(2),
+        "Null_Low"  : z_lo.ravel().round(2),
+        "Null_High" : z_hi.ravel().round(2),
+    })
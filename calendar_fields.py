@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TZ       = "America/New_York"
+MIN_NS   = 60 * 10**9
+DAY_NS   = 86_400 * 10**9
+NAT      = np.iinfo(np.int64).min
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS   = ["January", "February", "March", "April", "May", "June", "July",
+            "August", "September", "October", "November", "December"]
+_MONTH_ABBR = tuple(m[:3].upper() for m in MONTHS)
+
+
+def as_ns(ts):
+    """datetime64 / DatetimeIndex / Series / int64 array → int64 UTC nanoseconds."""
+    if isinstance(ts, pd.Series):
+        ts = pd.DatetimeIndex(ts) if ts.dtype.kind == "M" else ts.to_numpy()
+    if isinstance(ts, pd.DatetimeIndex):
+        return ts.as_unit("ns").asi8 if ts.tz is None else ts.tz_convert("UTC").as_unit("ns").asi8
+    ts = np.asarray(ts)
+    if ts.dtype.kind == "M":
+        return ts.astype("M8[ns]").view(np.int64)
+    return ts.astype(np.int64, copy=False)
+
+
+def _offsets(utc_ns, tz):
+    """UTC offset (ns) in effect at each instant, via pandas — used on tiny probe arrays only."""
+    idx = pd.DatetimeIndex(utc_ns.view("M8[ns]")).tz_localize("UTC").tz_convert(tz)
+    return idx.tz_localize(None).as_unit("ns").asi8 - utc_ns
+
+
+@lru_cache(maxsize=None)
+def dst_table(tz, first_year, last_year):
+    """
+    UTC instants at which `tz` changes its offset between `first_year` and
+    `last_year`, and the offset in effect from each: (starts, offsets).
+
+    Offsets are probed once per day, then each day that contains a change is
+    probed per minute to place the transition exactly. `starts[0]` is the
+    int64 minimum, so every instant in the range finds its row with
+    `searchsorted(starts, t, "right") - 1`.
+    """
+    lo = pd.Timestamp(f"{first_year - 1}-12-31").value
+    hi = pd.Timestamp(f"{last_year + 1}-01-02").value
+    days = np.arange(lo, hi, DAY_NS, dtype=np.int64)
+    offs = _offsets(days, tz)
+
+    starts, values = [NAT], [offs[0]]
+    for i in np.flatnonzero(np.diff(offs) != 0):
+        minutes = days[i] + MIN_NS * np.arange(1, 1441, dtype=np.int64)
+        m_offs = _offsets(minutes, tz)
+        j = np.flatnonzero(m_offs != offs[i])[0]
+        starts.append(minutes[j])
+        values.append(m_offs[j])
+    return np.array(starts, dtype=np.int64), np.array(values, dtype=np.int64)
+
+
+def to_local_ns(utc_ns, tz=TZ):
+    """Local wall-clock nanoseconds (still int64) for UTC instants; tz=None is a no-op."""
+    utc_ns = as_ns(utc_ns)
+    valid = utc_ns[utc_ns != NAT]
+    if tz is None or len(valid) == 0:
+        return utc_ns
+    years = np.array([valid.min(), valid.max()]).view("M8[ns]").astype("M8[Y]").astype(np.int64)
+    starts, offsets = dst_table(tz, int(years[0]) + 1970, int(years[1]) + 1970)
+    local = utc_ns + offsets[np.searchsorted(starts, utc_ns, side="right") - 1]
+    return np.where(utc_ns == NAT, NAT, local) if len(valid) < len(utc_ns) else local
+
+
+def weekday_of(day):
+    """Weekday code (Monday = 0) of day numbers; 1970-01-01 was a Thursday."""
+    return ((np.asarray(day) + 3) % 7).astype(np.uint8)
+
+
+def day_minute(utc_ns, tz=TZ):
+    """Local day number (days since 1970-01-01) and minute of day — the two fields most stages need."""
+    local = to_local_ns(utc_ns, tz)
+    day = local // DAY_NS
+    return day, ((local - day * DAY_NS) // MIN_NS).astype(np.int16)
+
+
+def calendar_fields(utc_ns, tz=TZ):
+    """
+    Local calendar fields of UTC instants as integer arrays, with no Python
+    datetime objects: `day` (days since 1970-01-01), `minute` (minute of
+    day), `hour`, `weekday` (Monday = 0), `day_of_month`, `month`, `quarter`,
+    `year`, `iso_year`, `iso_week`, plus `month_ord` (months since 1970-01,
+    which is also the pandas monthly Period ordinal).
+    """
+    day, minute = day_minute(utc_ns, tz)
+    weekday = weekday_of(day)
+    month_ord = day.astype("M8[D]").astype("M8[M]").astype(np.int64)
+    month_start = month_ord.astype("M8[M]").astype("M8[D]").astype(np.int64)
+    year = month_ord // 12 + 1970
+    month = month_ord % 12 + 1
+
+    # ISO week: the week belongs to the year of its Thursday
+    thursday = day - weekday.astype(np.int64) + 3
+    iso_year = thursday.astype("M8[D]").astype("M8[Y]").astype(np.int64) + 1970
+    jan1 = (iso_year - 1970).astype("M8[Y]").astype("M8[D]").astype(np.int64)
+
+    return {
+        "day"          : day,
+        "minute"       : minute,
+        "hour"         : (minute // 60).astype(np.uint8),
+        "weekday"      : weekday,
+        "day_of_month" : (day - month_start + 1).astype(np.uint8),
+        "month"        : month.astype(np.uint8),
+        "quarter"      : ((month - 1) // 3 + 1).astype(np.uint8),
+        "year"         : year.astype(np.int16),
+        "iso_year"     : iso_year.astype(np.int16),
+        "iso_week"     : ((thursday - jan1) // 7 + 1).astype(np.uint8),
+        "month_ord"    : month_ord,
+    }
+
+
+def period_ordinals(day, freq):
+    """
+    pandas Period ordinals of `freq` ("D", "W-XXX", "M", "Q[-XXX]",
+    "Y[-XXX]") for local day numbers, computed arithmetically so they can
+    key `period_extremes` and still be turned into a PeriodIndex with
+    `PeriodIndex.from_ordinals`.
+    """
+    day = np.asarray(day, dtype=np.int64)
+    if freq == "D":
+        return day
+    if freq.startswith("W"):
+        ref = pd.Period(pd.Timestamp(0), freq)
+        first = ref.start_time.value // DAY_NS
+        return (day - first) // 7 + ref.ordinal
+    month_ord = day.astype("M8[D]").astype("M8[M]").astype(np.int64)
+    if freq in ("M", "ME"):
+        return month_ord
+    if freq.startswith(("Q", "Y", "A")):
+        # anchored periods end in month `end` (Q-MAR, Y-JUN, …; DEC by default)
+        base, _, anchor = freq.partition("-")
+        if base in ("Q", "Y", "A") and anchor in ("",) + _MONTH_ABBR:
+            end = _MONTH_ABBR.index(anchor or "DEC") + 1
+            return (month_ord + 12 - end) // (3 if base == "Q" else 12)
+    raise ValueError(f"Unsupported period frequency: {freq!r}")
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from calendar_fields import WEEKDAYS, day_minute, weekday_of
+from sessions import session_codes
+
+WEEK_TYPES = ["Bullish", "Bearish"]
+EXTREMES   = ["Low", "High"]
+DAYS       = WEEKDAYS[:5]
+HOURS      = 24
+AXES       = ("week_type", "extreme", "weekday", "session", "hour")
+
+
+def count_extremes(bullish, low_ts, high_ts, sessions, low_session=None, high_session=None,
+                   tz=None):
+    """
+    Contingency counts of where each period's low and high formed.
+
+    `low_ts`/`high_ts` are the extreme timestamps (datetime64 or int64 ns);
+    weekday/hour/session are read in `tz` local time, or as stored when
+    `tz` is None. Session codes are looked up from `sessions` unless
+    already known.
+
+    Returns a store: {"counts": int64 array shaped week type × extreme ×
+    weekday × session × hour, plus the label list of every axis}.
+    """
+    labels = list(sessions) + ["Other"]
+    shape = (len(WEEK_TYPES), len(EXTREMES), len(WEEKDAYS), len(labels), HOURS)
+    wt = np.where(np.asarray(bullish, dtype=bool), 0, 1)
+
+    counts = np.zeros(shape, dtype=np.int64)
+    for e, (ts, sess) in enumerate([(low_ts, low_session), (high_ts, high_session)]):
+        day, minute = day_minute(ts, tz)
+        if sess is None:
+            sess, _ = session_codes(minute, sessions)
+        flat = np.ravel_multi_index(
+            (wt, np.full(len(wt), e), weekday_of(day), np.asarray(sess, dtype=np.intp), minute // 60),
+            shape,
+        )
+        counts += np.bincount(flat, minlength=counts.size).reshape(shape)
+    return make_store(counts, labels)
+
+
+def make_store(counts, sessions):
+    return {
+        "counts"     : counts,
+        "week_types" : list(WEEK_TYPES),
+        "extremes"   : list(EXTREMES),
+        "weekdays"   : list(WEEKDAYS),
+        "sessions"   : list(sessions),
+    }
+
+
+def save_counts(path, store):
+    np.savez_compressed(
+        path,
+        counts=store["counts"],
+        **{k: np.array(store[k]) for k in ("week_types", "extremes", "weekdays", "sessions")},
+    )
+
+
+def load_counts(path):
+    with np.load(path) as z:
+        return make_store(z["counts"], [str(s) for s in z["sessions"]])
+
+
+def merge_counts(*stores):
+    """Add stores from different instruments / time ranges (labels must match)."""
+    first = stores[0]
+    for s in stores[1:]:
+        if s["sessions"] != first["sessions"]:
+            raise ValueError("Cannot merge count stores built with different SESSIONS")
+    return make_store(sum(s["counts"] for s in stores), first["sessions"])
+
+
+# ── slicing ──────────────────────────────────────────────────────────────────
+def _cell(store, week_type, extreme):
+    return store["counts"][WEEK_TYPES.index(week_type), EXTREMES.index(extreme)]
+
+
+def week_type_counts(store):
+    """Number of periods of each week type."""
+    return pd.Series(store["counts"][:, 0].sum(axis=(1, 2, 3)), index=WEEK_TYPES)
+
+
+def weekday_counts(store, week_type, extreme):
+    return pd.Series(_cell(store, week_type, extreme).sum(axis=(1, 2)), index=WEEKDAYS)
+
+
+def weekday_session_counts(store, week_type, extreme):
+    return pd.DataFrame(
+        _cell(store, week_type, extreme).sum(axis=2), index=WEEKDAYS, columns=store["sessions"]
+    )
+
+
+def hour_counts(store, week_type, extreme):
+    return pd.Series(_cell(store, week_type, extreme).sum(axis=(0, 1)), index=range(HOURS))
+
+
+def weekday_table(store, extreme, days=DAYS):
+    """% of each week type whose `extreme` formed on each of `days`."""
+    cond = {}
+    for wb in WEEK_TYPES:
+        c = weekday_counts(store, wb, extreme)
+        cond[wb] = (c[c > 0] / c.sum() * 100).reindex(days, fill_value=0).round(2)
+    table = pd.DataFrame(cond).T
+    table.index.name = "Week_Type"
+    return table
@@ -0,0 +1,137 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import load_bars
+from calendar_fields import DAY_NS, MIN_NS, WEEKDAYS, as_ns, to_local_ns, weekday_of
+from counts import EXTREMES, WEEK_TYPES
+from periods import period_extremes
+from profiling import stage
+from sessions import MINUTES_PER_DAY, SESSIONS, minute_of_day, session_codes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV  = sys.argv[1] if len(sys.argv) > 1 else "nq.csv"   # 1-minute bars in UTC
+DELIM      = ";"
+TZ         = "America/New_York"
+DAY_ROLL   = "18:00"         # trading day starts here (ET); "00:00" = calendar days
+BUCKET_MIN = 30              # histogram resolution, in minutes (1 = per minute)
+DAYS_OUT   = "daily_extremes.csv"          # one row per trading day
+HIST_OUT   = "daily_extreme_timing.csv"    # time-of-day histograms
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def trading_days(local_ns, roll=DAY_ROLL):
+    """
+    Trading-day number of every bar (days since 1970-01-01, named after the
+    calendar day the session ends on): with an 18:00 roll, Monday 18:00 to
+    Tuesday 17:59 is Tuesday's trading day.
+    """
+    shift = (MINUTES_PER_DAY - minute_of_day(roll)) % MINUTES_PER_DAY * MIN_NS
+    return (np.asarray(local_ns) + shift) // DAY_NS
+
+
+def day_extremes(ts, open_, high, low, close, roll=DAY_ROLL, sessions=SESSIONS, tz=TZ):
+    """
+    One row per trading day: weekday, day type and the local time and
+    session of its high and low, from one segment reduction over the bars.
+    """
+    local = to_local_ns(as_ns(ts), tz)
+    ext = period_extremes(trading_days(local, roll), open_, high, low, close)
+    day = ext.index.to_numpy()
+    out = pd.DataFrame({
+        "Trading_Day" : day.astype("M8[D]"),
+        "Weekday"     : weekday_of(day),
+        "Day_Type"    : np.where(ext["Close"] > ext["Open"], 0, 1).astype(np.uint8),
+    })
+    for extreme in EXTREMES:
+        minute = local[ext[f"{extreme}_Pos"]] % DAY_NS // MIN_NS
+        out[f"{extreme}_Minute"] = minute.astype(np.int16)
+        out[f"{extreme}_Session"], labels = session_codes(minute, sessions)
+    return out, labels
+
+
+def timing_histogram(days, bucket=BUCKET_MIN):
+    """
+    Counts of day type × extreme × weekday × time-of-day bucket, built with
+    one bincount per extreme.
+    """
+    n_buckets = -(-MINUTES_PER_DAY // bucket)    # the last bucket may be partial
+    shape = (len(WEEK_TYPES), len(EXTREMES), len(WEEKDAYS), n_buckets)
+    hist = np.zeros(shape, dtype=np.int64)
+    for e, extreme in enumerate(EXTREMES):
+        flat = np.ravel_multi_index(
+            (days["Day_Type"], np.full(len(days), e), days["Weekday"],
+             days[f"{extreme}_Minute"].to_numpy() // bucket),
+            shape,
+        )
+        hist += np.bincount(flat, minlength=hist.size).reshape(shape)
+    return hist
+
+
+def histogram_table(hist, bucket=BUCKET_MIN):
+    """
+    Tidy histogram: populated (day type, weekday) cells, % within each.
+    Time is the start of each bucket; the last one runs to midnight.
+    """
+    n = hist.sum(axis=3, keepdims=True)
+    pct = (hist / np.maximum(n, 1) * 100).round(2)
+    dt, ex, wd, b = np.indices(hist.shape).reshape(4, -1)
+    start = b * bucket
+    table = pd.DataFrame({
+        "Day_Type" : np.take(WEEK_TYPES, dt),
+        "Extreme"  : np.take(EXTREMES, ex),
+        "Weekday"  : np.take(WEEKDAYS, wd),
+        "Time"     : [f"{m // 60:02d}:{m % 60:02d}" for m in start],
+        "Count"    : hist.ravel(),
+        "N"        : np.broadcast_to(n, hist.shape).ravel(),
+        "Pct"      : pct.ravel(),
+    })
+    return table[table["N"] > 0].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_CSV):
+        print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
+        sys.exit(1)
+
+    # 1. LOAD & SORT
+    with stage("1. load & sort") as st:
+        bars = load_bars(INPUT_CSV, delim=DELIM).sort_values("DateTime", kind="stable",
+                                                             ignore_index=True)
+        st.rows_out = len(bars)
+
+    # 2. TRADING DAYS (roll at DAY_ROLL ET) → per-day high/low minute and session
+    with stage("2. daily extremes", rows_in=len(bars)) as st:
+        days, labels = day_extremes(bars["DateTime"], bars["Open"], bars["High"],
+                                    bars["Low"], bars["Close"])
+        st.rows_out = len(days)
+
+    # 3. TIME-OF-DAY HISTOGRAMS per weekday and day type
+    with stage("3. timing histograms", rows_in=len(days)):
+        hist = timing_histogram(days)
+        table = histogram_table(hist)
+
+    # 4. SAVE (labels attached only here)
+    out = days.assign(
+        Weekday=np.take(WEEKDAYS, days["Weekday"]),
+        Day_Type=np.take(WEEK_TYPES, days["Day_Type"]),
+        **{f"{e}_Time": [f"{m // 60:02d}:{m % 60:02d}" for m in days[f"{e}_Minute"]]
+           for e in EXTREMES},
+        **{f"{e}_Session": np.take(labels, days[f"{e}_Session"]) for e in EXTREMES},
+    ).drop(columns=[f"{e}_Minute" for e in EXTREMES])
+    out.to_csv(DAYS_OUT, index=False)
+    table.to_csv(HIST_OUT, index=False)
+
+    for wb in WEEK_TYPES:
+        for extreme in EXTREMES:
+            sub = table[(table["Day_Type"] == wb) & (table["Extreme"] == extreme)]
+            by_time = sub.groupby("Time")["Count"].sum()
+            if by_time.sum() == 0:
+                continue
+            top = (by_time / by_time.sum() * 100).round(2).nlargest(3)
+            print(f"📊 {extreme}-of-day, {wb} days (n={by_time.sum()}): "
+                  + ", ".join(f"{t} {p:.2f}%" for t, p in top.items()))
+    print(f"\nSaved → {DAYS_OUT}")
+    print(f"Saved → {HIST_OUT}")
@@ -0,0 +1,283 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import load_bars
+from calendar_fields import DAY_NS, WEEKDAYS, as_ns, calendar_fields, period_ordinals
+from counts import EXTREMES, WEEK_TYPES
+from periods import period_extremes, segment_starts
+from profiling import stage
+from sessions import MINUTES_PER_DAY, SESSIONS, minute_of_day, session_codes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV  = "nq.csv"                 # 1-minute bars in UTC
+DELIM      = ";"
+TZ         = "America/New_York"
+PERIOD     = "W-MON"                  # period whose low/high must hold: "W-MON", "D" or "M"
+BUCKET_MIN = 30                       # resolution of the "now" checkpoints, in minutes
+INDEX_OUT  = "holds_index.npz"        # mergeable total / holds counts
+TABLE_OUT  = "holds_table.csv"        # every populated cell, tidy
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# ── RUNNING EXTREMES ─────────────────────────────────────────────────────────
+def running_extremes(key, low, high):
+    """
+    Running (expanding) low and high within each period, plus the position
+    of the bar that set each. `key` must be grouped (bars sorted by time).
+    A later bar that only ties the running extreme does not move its
+    set-point.
+    """
+    key = np.asarray(key)
+    low  = np.where(np.isnan(low),  np.inf,  np.asarray(low,  dtype=np.float64))
+    high = np.where(np.isnan(high), -np.inf, np.asarray(high, dtype=np.float64))
+    run_low  = pd.Series(low).groupby(key, sort=False).cummin().to_numpy()
+    run_high = pd.Series(high).groupby(key, sort=False).cummax().to_numpy()
+
+    first = np.zeros(len(key), dtype=bool)
+    first[segment_starts(key)] = True
+    pos = np.arange(len(key))
+    # every period's first bar is a set-point, so a global running max of the
+    # set-point positions never reaches back into the previous period
+    low_pos  = np.maximum.accumulate(np.where(first | (low  < np.r_[np.inf,  run_low[:-1]]),  pos, 0))
+    high_pos = np.maximum.accumulate(np.where(first | (high > np.r_[-np.inf, run_high[:-1]]), pos, 0))
+    return run_low, low_pos, run_high, high_pos
+
+
+def _now_days(period):
+    """Labels of the "now" day axis: weekdays, or days of the month for monthly periods."""
+    if period.startswith("M"):
+        return [f"Day {d}" for d in range(1, 32)]
+    return list(WEEKDAYS)
+
+
+# ── INDEX ────────────────────────────────────────────────────────────────────
+def build_index(ts, open_, high, low, close, period=PERIOD, bucket=BUCKET_MIN,
+                sessions=SESSIONS, tz=TZ):
+    """
+    Count, for every period and every `bucket`-minute checkpoint in it, the
+    state at the checkpoint (the end of its bucket): is the extreme so far
+    the period's final extreme? Checkpoints run from the period's first bar
+    to its last calendar day, so a bucket without bars (a halt, the weekend)
+    carries the state of the last bar before it. Cells are week type ×
+    extreme × now day × now bucket × set-point weekday × set-point session,
+    for `total` and `holds`.
+    """
+    ts = as_ns(ts)
+    cal = calendar_fields(ts, tz)
+    key = period_ordinals(cal["day"], period)
+    n_buckets = -(-MINUTES_PER_DAY // bucket)    # the last bucket may be partial
+    session, labels = session_codes(cal["minute"], sessions)
+
+    ext = period_extremes(key, open_, high, low, close)
+    starts = segment_starts(key)
+    first = np.zeros(len(key), dtype=bool)
+    first[starts] = True
+    seg = np.cumsum(first) - 1
+    wt = np.where((ext["Close"] > ext["Open"]).to_numpy(), 0, 1)[seg]
+
+    # checkpoints: every bucket from the period's first bar to its last day,
+    # each at the last bar in or before it (the running max keeps the slots
+    # sorted through the repeated fall-back hour)
+    bar_slot = np.maximum.accumulate(cal["day"].astype(np.int64) * n_buckets
+                                     + cal["minute"] // bucket)
+    end_day = as_ns(pd.PeriodIndex.from_ordinals(ext.index, freq=period).end_time) // DAY_NS
+    span_first = bar_slot[starts]
+    span_len = (end_day + 1) * n_buckets - span_first
+    offset = np.repeat(span_first - (np.cumsum(span_len) - span_len), span_len)
+    slots = offset + np.arange(span_len.sum())
+    check = np.searchsorted(bar_slot, slots, side="right") - 1
+    slot_cal = calendar_fields(slots // n_buckets * DAY_NS, tz=None)
+    now_day = slot_cal["day_of_month"] - 1 if period.startswith("M") else slot_cal["weekday"]
+    now_bucket = slots % n_buckets
+
+    run_low, low_pos, run_high, high_pos = running_extremes(key, low, high)
+    shape = (len(WEEK_TYPES), len(EXTREMES), len(_now_days(period)), n_buckets,
+             len(WEEKDAYS), len(labels))
+    total = np.zeros(shape, dtype=np.int64)
+    holds = np.zeros(shape, dtype=np.int64)
+    for e, (run, set_pos, final) in enumerate([
+        (run_low,  low_pos,  ext["Low"].to_numpy()),
+        (run_high, high_pos, ext["High"].to_numpy()),
+    ]):
+        c, p = check, set_pos[check]
+        flat = np.ravel_multi_index(
+            (wt[c], np.full(len(c), e), now_day, now_bucket, cal["weekday"][p], session[p]),
+            shape,
+        )
+        held = run[c] == final[seg[c]]
+        total += np.bincount(flat, minlength=total.size).reshape(shape)
+        holds += np.bincount(flat[held], minlength=holds.size).reshape(shape)
+    return make_index(total, holds, period, bucket, labels)
+
+
+def make_index(total, holds, period, bucket, sessions):
+    return {
+        "total"    : total,
+        "holds"    : holds,
+        "period"   : period,
+        "bucket"   : int(bucket),
+        "now_days" : _now_days(period),
+        "sessions" : list(sessions),
+    }
+
+
+def save_index(path, index):
+    np.savez_compressed(
+        path, total=index["total"], holds=index["holds"], period=np.array(index["period"]),
+        bucket=np.array(index["bucket"]), sessions=np.array(index["sessions"]),
+    )
+
+
+def load_index(path):
+    with np.load(path) as z:
+        return make_index(z["total"], z["holds"], str(z["period"]), int(z["bucket"]),
+                          [str(s) for s in z["sessions"]])
+
+
+def merge_indexes(*indexes):
+    """Add indexes from different instruments / time ranges (layout must match)."""
+    first = indexes[0]
+    layout = (first["period"], first["bucket"], first["sessions"])
+    for ix in indexes[1:]:
+        if (ix["period"], ix["bucket"], ix["sessions"]) != layout:
+            raise ValueError("Cannot merge hold indexes built with different PERIOD/BUCKET_MIN/SESSIONS")
+    return make_index(sum(ix["total"] for ix in indexes), sum(ix["holds"] for ix in indexes),
+                      first["period"], first["bucket"], first["sessions"])
+
+
+# ── QUERIES ──────────────────────────────────────────────────────────────────
+def _pick(labels, value, what):
+    """
+    Axis position of `value`: an exact (case-insensitive) label, else a
+    unique label prefix. None keeps the whole axis.
+    """
+    if value is None:
+        return slice(None)
+    names = [str(lab).lower() for lab in labels]
+    key = str(value).lower()
+    if key in names:
+        return names.index(key)
+    matches = [i for i, name in enumerate(names) if name.startswith(key)]
+    if len(matches) != 1:
+        problem = "Ambiguous" if matches else "Unknown"
+        raise ValueError(f"{problem} {what} {value!r}; expected one of {list(labels)}")
+    return matches[0]
+
+
+def _previous_day(period, day):
+    """
+    "Now" day axis position of the day before `day` if that day is in the
+    same period, None if `day` is the period's first day.
+    """
+    if period == "D":
+        return None
+    if period.startswith("M"):
+        return day - 1 if day > 0 else None
+    if period.startswith("W"):
+        first = pd.Period(pd.Timestamp(0), period).start_time.weekday()
+        return None if day == first else (day - 1) % len(WEEKDAYS)  # a week may run Sun → Mon
+    raise ValueError(f"Unsupported hold period: {period!r}")
+
+
+def query(index, now_day, now_time, extreme="Low", set_day=None, set_session=None,
+          week_type=None):
+    """
+    P(the period's `extreme` so far holds | it is `now_day` `now_time`, the
+    extreme so far was set on `set_day` in `set_session`, week type).
+
+    The state is the one at the end of the last bucket finished by
+    `now_time`, so no later bar is seen. Before the day's first bucket ends
+    that is the end of the previous day of the same period; on a period's
+    first day there is no state yet. Arguments left as None are summed over.
+    Returns (holds, total, probability).
+    """
+    bucket = index["bucket"]
+    now_bucket = minute_of_day(now_time) // bucket - 1   # last bucket finished by now
+    day = _pick(index["now_days"], now_day, "day")
+    days = range(len(index["now_days"])) if isinstance(day, slice) else [day]
+    if now_bucket < 0:                          # no bucket of today finished yet
+        now_bucket = index["total"].shape[3] - 1
+        days = [p for p in (_previous_day(index["period"], d) for d in days) if p is not None]
+    rest = (
+        _pick(WEEKDAYS, set_day, "set day"), _pick(index["sessions"], set_session, "session"),
+    )
+    head = (_pick(WEEK_TYPES, week_type, "week type"), _pick(EXTREMES, extreme, "extreme"))
+    held = total = 0
+    for d in days:
+        cell = (*head, d, now_bucket, *rest)
+        held += int(index["holds"][cell].sum())
+        total += int(index["total"][cell].sum())
+    return held, total, (held / total if total else float("nan"))
+
+
+def hold_table(index):
+    """Tidy table of every populated cell with its hold probability."""
+    total, holds = index["total"], index["holds"]
+    cells = np.nonzero(total)
+    wt, ex, nd, nb, sd, ss = cells
+    start = nb * index["bucket"]
+    return pd.DataFrame({
+        "Week_Type"   : np.take(WEEK_TYPES, wt),
+        "Extreme"     : np.take(EXTREMES, ex),
+        "Now_Day"     : np.take(index["now_days"], nd),
+        "Now_Bucket"  : [f"{m // 60:02d}:{m % 60:02d}" for m in start],
+        "Set_Day"     : np.take(WEEKDAYS, sd),
+        "Set_Session" : np.take(index["sessions"], ss),
+        "Total"       : total[cells],
+        "Holds"       : holds[cells],
+        "P_Holds"     : (holds[cells] / total[cells] * 100).round(2),
+    })
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Build the running-extreme hold index, or query it: "
+                    "P(extreme so far holds | now, where it was set, week type).")
+    ap.add_argument("input", nargs="?", default=INPUT_CSV, help="bars to index (UTC)")
+    ap.add_argument("--index", default=INDEX_OUT, help="index file to write / query")
+    ap.add_argument("--period", default=PERIOD)
+    ap.add_argument("--bucket", type=int, default=BUCKET_MIN)
+    ap.add_argument("--query", action="store_true", help="query an existing index instead")
+    ap.add_argument("--now-day", help="e.g. Tuesday (or 'Day 5' for monthly periods)")
+    ap.add_argument("--now-time", help="local time, e.g. 10:00")
+    ap.add_argument("--extreme", default="Low", choices=EXTREMES)
+    ap.add_argument("--set-day", help="weekday the extreme so far was set on")
+    ap.add_argument("--set-session", help="session it was set in, e.g. London")
+    ap.add_argument("--week-type", choices=WEEK_TYPES)
+    args = ap.parse_args(argv)
+
+    if args.query:
+        if not (args.now_day and args.now_time):
+            ap.error("--query needs --now-day and --now-time")
+        try:
+            held, total, p = query(load_index(args.index), args.now_day, args.now_time,
+                                   args.extreme, args.set_day, args.set_session, args.week_type)
+        except ValueError as exc:
+            ap.error(str(exc))
+        print(f"P({args.extreme} so far holds) = {p * 100:.2f}%  ({held} of {total} periods)")
+        return 0
+
+    if not os.path.exists(args.input):
+        print(f"Input file '{args.input}' not found. Please adjust INPUT_CSV to your filename.")
+        return 1
+    with stage("1. load & sort") as st:
+        bars = load_bars(args.input, delim=DELIM).sort_values("DateTime", kind="stable",
+                                                              ignore_index=True)
+        st.rows_out = len(bars)
+    with stage("2. running extremes → hold index", rows_in=len(bars)):
+        index = build_index(bars["DateTime"], bars["Open"], bars["High"], bars["Low"],
+                            bars["Close"], period=args.period, bucket=args.bucket)
+    save_index(args.index, index)
+    table = hold_table(index)
+    table.to_csv(TABLE_OUT, index=False)
+    print(f"Saved → {args.index}")
+    print(f"Saved → {TABLE_OUT}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import hashlib
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import read_bars_csv
+from counts import count_extremes, make_store, merge_counts, save_counts, weekday_table
+from periods import rollup_extremes
+from profiling import stage
+from sessions import SESSIONS
+from weekly import WEEK_START, results_rows, weekly_extremes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV   = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"   # grows by appends
+OUTPUT_CSV  = "results.csv"               # same layout sp500.py writes
+STATE_JSON  = "results.state.json"        # byte offset, open week, closed-week counts
+COUNTS_OUT  = "weekly_counts.npz"         # same count store sp500.py writes
+DELIMITER   = ";"
+LOW_OUT     = "low_day_distribution_by_week_type.csv"
+HIGH_OUT    = "high_day_distribution_by_week_type.csv"
+HEADER      = "Week_Start,Bull_Bear,High_Day,Low_Day\n"
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Incremental version of sp500.py (+ the tables of analyse-days.py).
+#
+# The first run processes the whole file. Every later run seeks to the byte
+# offset where the previous one stopped, parses only the appended bars, folds
+# them into the still-open last week, rewrites that week's row in results.csv
+# and appends rows for any newer weeks. The contingency counts of closed weeks
+# live in the state file, so the count store and distributions are re-derived
+# without reading the old rows again.
+
+
+def head_hash(path):
+    """Fingerprint of the first line: detects a file that was replaced, not appended."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.readline()).hexdigest()
+
+
+def fresh_state(path):
+    return {
+        "source"     : os.path.abspath(path),
+        "head"       : head_hash(path),
+        "week_start" : WEEK_START,
+        "offset"     : 0,           # bytes of INPUT_CSV already processed
+        "last_ts"    : None,        # newest bar processed (epoch ns)
+        "open_week"  : None,        # running summary of the last week
+        "open_row"   : None,        # byte offset of its row in OUTPUT_CSV
+        "sessions"   : list(SESSIONS),
+        "counts"     : None,        # closed-week count store (nested lists)
+    }
+
+
+def load_state(path):
+    """Saved state, or a fresh one if it is missing or no longer matches the input."""
+    if os.path.exists(STATE_JSON) and os.path.exists(OUTPUT_CSV):
+        with open(STATE_JSON) as f:
+            state = json.load(f)
+        if (state["source"] == os.path.abspath(path)
+                and state["week_start"] == WEEK_START
+                and state["sessions"] == list(SESSIONS)
+                and state["head"] == head_hash(path)
+                and state["offset"] <= os.path.getsize(path)):
+            return state
+    return fresh_state(path)
+
+
+def read_tail(path, offset):
+    """Bars appended after `offset` (complete lines only) and the new offset."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        tail = f.read()
+    tail = tail[:tail.rfind(b"\n") + 1]
+    if not tail.strip():
+        return None, offset
+    return read_bars_csv(io.BytesIO(tail), DELIMITER), offset + len(tail)
+
+
+def week_counts(weeks):
+    return count_extremes(
+        weeks["Close"] > weeks["Open"], weeks["Low_TS"], weeks["High_TS"], SESSIONS
+    )
+
+
+def update(path):
+    """Process the bars appended since the last run; return (new bars, rows written)."""
+    state = load_state(path)
+    with stage("read new bars") as st:
+        cols, offset = read_tail(path, state["offset"])
+        st.rows_out = 0 if cols is None else len(cols["DateTime"])
+    if cols is not None and state["last_ts"] is not None:
+        keep = cols["DateTime"] > state["last_ts"]
+        cols = {c: a[keep] for c, a in cols.items()}
+    n_new = 0 if cols is None else len(cols["DateTime"])
+    state["offset"] = offset
+    if n_new == 0:
+        with open(STATE_JSON, "w") as f:
+            json.dump(state, f)
+        return 0, 0
+
+    # fold the new bars into the open week (and whatever weeks follow it)
+    with stage("fold into open week", rows_in=n_new) as st:
+        weeks = weekly_extremes(
+            cols["DateTime"].view("M8[ns]"),
+            cols["Open"], cols["High"], cols["Low"], cols["Close"],
+            week_start=WEEK_START,
+        )
+        if state["open_week"] is not None:
+            prev = pd.DataFrame([state["open_week"]]).set_index("Key")
+            weeks = rollup_extremes(pd.concat([prev, weeks]), np.r_[prev.index, weeks.index])
+        rows = results_rows(weeks, week_start=WEEK_START)
+        st.rows_out = len(rows)
+
+    # rewrite the open week's row, append the rest
+    if state["open_row"] is None:
+        with open(OUTPUT_CSV, "w", newline="") as f:
+            f.write(HEADER)
+        state["open_row"] = len(HEADER.encode())
+    with open(OUTPUT_CSV, "r+b") as f:
+        f.truncate(state["open_row"])
+        f.seek(state["open_row"])
+        f.write(rows.iloc[:-1].to_csv(index=False, header=False, lineterminator="\n").encode())
+        state["open_row"] = f.tell()
+        f.write(rows.iloc[-1:].to_csv(index=False, header=False, lineterminator="\n").encode())
+
+    # every week but the last is closed now
+    closed = week_counts(weeks.iloc[:-1])
+    if state["counts"] is not None:
+        closed = merge_counts(closed, make_store(np.array(state["counts"]), closed["sessions"]))
+    state["counts"] = closed["counts"].tolist()
+    state["open_week"] = {"Key": int(weeks.index[-1]),
+                          **{c: weeks[c].iloc[-1].item() for c in weeks.columns}}
+    state["last_ts"] = int(cols["DateTime"].max())
+    with open(STATE_JSON, "w") as f:
+        json.dump(state, f)
+
+    # count store and distributions: closed weeks plus the open week
+    store = merge_counts(closed, week_counts(weeks.iloc[-1:]))
+    save_counts(COUNTS_OUT, store)
+    weekday_table(store, "Low").to_csv(LOW_OUT)
+    weekday_table(store, "High").to_csv(HIGH_OUT)
+    return n_new, len(rows)
+
+
+if __name__ == "__main__":
+    n_new, n_rows = update(INPUT_CSV)
+    if n_new == 0:
+        print("No new bars since the last run.")
+    else:
+        print(f"Processed {n_new} new bars, rewrote/appended {n_rows} week rows → {OUTPUT_CSV}")
+        print(f"Saved → {COUNTS_OUT}, {LOW_OUT}, {HIGH_OUT}")
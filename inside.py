@@ -1,88 +1,122 @@
+import sys
+
+import numpy as np
 import pandas as pd
 
+from bars import load_bars
+from calendar_fields import WEEKDAYS, day_minute, weekday_of
+from profiling import stage
+from streaks import inside_outside_flags, streak_histogram, window_counts
+
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV   = "sp500.csv"                        # your raw daily data
+INPUT_CSV   = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"   # your raw daily data
 WKDAY_OUT   = "inside_outside_weekday_probs.csv"
+RUNS_OUT    = "inside_outside_streak_lengths.csv"
+COMPACT     = False     # float32 prices / uint32 volume: 28 vs 48 bytes per bar (~1.7x)
 # ─────────────────────────────────────────────────────────────────────────────
 
 # 1. LOAD & SORT
-df = (
-    pd.read_csv(
-        INPUT_CSV,
-        sep=";",
-        header=None,
-        names=["Date","Open","High","Low","Close","Volume"],
-        parse_dates=["Date"],
-        date_parser=lambda s: pd.to_datetime(s, format="%Y%m%d"),
+with stage("1. load & sort") as st:
+    df = (
+        load_bars(INPUT_CSV, delim=";", compact=COMPACT)
+        .rename(columns={"DateTime": "Date"})
+        .sort_values("Date")
+        .reset_index(drop=True)
     )
-    .sort_values("Date")
-    .reset_index(drop=True)
-)
+    st.rows_out = len(df)
 
 # 2. FLAG INSIDE / OUTSIDE
-df["Prev_High"] = df["High"].shift(1)
-df["Prev_Low"]  = df["Low"].shift(1)
+with stage("2. flag inside/outside", rows_in=len(df)) as st:
+    df["Prev_High"] = df["High"].shift(1)
+    df["Prev_Low"]  = df["Low"].shift(1)
 
-# Inside: High ≤ Prev_High AND Low ≥ Prev_Low
-df["Inside"] = (df["High"] <= df["Prev_High"]) & (df["Low"] >= df["Prev_Low"])
+    # Inside: High ≤ Prev_High AND Low ≥ Prev_Low
+    # Outside: High > Prev_High AND Low < Prev_Low
+    df["Inside"], df["Outside"] = inside_outside_flags(df["High"], df["Low"])
 
-# Outside: High > Prev_High AND Low < Prev_Low
-df["Outside"] = (df["High"] > df["Prev_High"]) & (df["Low"] < df["Prev_Low"])
+    # Drop first row (no prior day to compare)
+    df = df.dropna(subset=["Prev_High","Prev_Low"]).copy()
+    st.rows_out = len(df)
 
-# Drop first row (no prior day to compare)
-df = df.dropna(subset=["Prev_High","Prev_Low"]).copy()
+# 3. WEEKDAY PROBABILITIES (integer weekday codes; names only label the table)
+def weekday_totals(mask=None):
+    codes = weekday if mask is None else weekday[np.asarray(mask, dtype=bool)]
+    return pd.Series(np.bincount(codes, minlength=7)[:5], index=WEEKDAYS[:5])
 
-# 3. WEEKDAY PROBABILITIES
-df["Weekday"] = df["Date"].dt.day_name()
-wk_totals    = df["Weekday"].value_counts().reindex(
-                 ["Monday","Tuesday","Wednesday","Thursday","Friday"], fill_value=0)
+with stage("3. weekday probabilities", rows_in=len(df)) as st:
+    day, _  = day_minute(df["Date"], tz=None)
+    weekday = weekday_of(day)
 
-inside_counts  = df[df["Inside"]]["Weekday"].value_counts().reindex(wk_totals.index, fill_value=0)
-outside_counts = df[df["Outside"]]["Weekday"].value_counts().reindex(wk_totals.index, fill_value=0)
+    wk_totals      = weekday_totals()
+    inside_counts  = weekday_totals(df["Inside"])
+    outside_counts = weekday_totals(df["Outside"])
 
-inside_pct  = (inside_counts  / wk_totals * 100).round(2)
-outside_pct = (outside_counts / wk_totals * 100).round(2)
+    inside_pct  = (inside_counts  / wk_totals * 100).round(2)
+    outside_pct = (outside_counts / wk_totals * 100).round(2)
 
-weekday_summary = pd.DataFrame({
-    "Total_Days":    wk_totals,
-    "Inside_Days":   inside_counts,
-    "Pct_Inside":    inside_pct,
-    "Outside_Days":  outside_counts,
-    "Pct_Outside":   outside_pct
-})
-weekday_summary.index.name = "Weekday"
-weekday_summary.to_csv(WKDAY_OUT)
+    weekday_summary = pd.DataFrame({
+        "Total_Days":    wk_totals,
+        "Inside_Days":   inside_counts,
+        "Pct_Inside":    inside_pct,
+        "Outside_Days":  outside_counts,
+        "Pct_Outside":   outside_pct
+    })
+    weekday_summary.index.name = "Weekday"
+    weekday_summary.to_csv(WKDAY_OUT)
+    st.rows_out = len(weekday_summary)
 
 print("=== Weekday probabilities ===")
 print(weekday_summary.to_string())
 print(f"\nSaved → {WKDAY_OUT}\n")
 
 # 4. RUN-LENGTH PROBABILITIES
-def run_length_probs(flag_series, max_len=4):
+def run_length_probs(flag_series, max_len=None):
     """
     Given a boolean Series, compute:
       P(run of length N) = (# of windows of length N all True) / (total windows of length N)
-    for N=2..max_len.
+    for N=2..max_len (default: the longest streak in the data).
+    All window counts come from a single run-length encoding of the flag.
     """
+    hist   = streak_histogram(flag_series.values)
+    counts = window_counts(hist)
+    total_days = len(flag_series)
+    if max_len is None:
+        max_len = len(hist) - 1
     results = {}
-    s = flag_series.values
-    total_days = len(s)
     for N in range(2, max_len+1):
         windows = total_days - N + 1
         if windows <= 0:
             results[N] = float("nan")
             continue
-        count = sum(s[i:i+N].all() for i in range(windows))
+        count = counts[N] if N < len(counts) else 0
         results[N] = round(count / windows * 100, 2)
     return results
 
-inside_runs  = run_length_probs(df["Inside"],  max_len=4)
-outside_runs = run_length_probs(df["Outside"], max_len=4)
+with stage("4. run-length probabilities", rows_in=len(df)) as st:
+    inside_hist  = streak_histogram(df["Inside"].values)
+    outside_hist = streak_histogram(df["Outside"].values)
+    max_len      = max(4, len(inside_hist) - 1, len(outside_hist) - 1)
+
+    inside_runs  = run_length_probs(df["Inside"],  max_len=max_len)
+    outside_runs = run_length_probs(df["Outside"], max_len=max_len)
+    st.rows_out = max_len - 1
 
 print("=== Run-length probabilities (in % of N-day windows) ===")
 print("Length | Inside-streak | Outside-streak")
 print("-"*38)
-for N in range(2, 5):
+for N in range(2, max_len+1):
     i_pct = f"{inside_runs[N]:5.2f}%" if not pd.isna(inside_runs[N]) else "  N/A"
     o_pct = f"{outside_runs[N]:5.2f}%" if not pd.isna(outside_runs[N]) else "  N/A"
     print(f"  {N:>1}    |    {i_pct:>6}    |    {o_pct:>6}")
+
+# 5. FULL STREAK-LENGTH HISTOGRAM (# of maximal streaks of exactly N days)
+def padded(hist, n):
+    return np.pad(hist, (0, max(0, n + 1 - len(hist))))[1:n+1]
+
+streak_summary = pd.DataFrame({
+    "Inside_Streaks" : padded(inside_hist,  max_len),
+    "Outside_Streaks": padded(outside_hist, max_len),
+}, index=pd.Index(range(1, max_len+1), name="Length"))
+streak_summary.to_csv(RUNS_OUT)
+
+print(f"\nSaved → {RUNS_OUT}")
@@ -1,95 +1,130 @@
+import sys
+
+import numpy as np
 import pandas as pd
 
+from bars import iter_bars, load_bars
+from bootstrap import bootstrap_table
+from calendar_fields import as_ns, day_minute, period_ordinals
+from counts import (
+    count_extremes, hour_counts, save_counts, weekday_session_counts,
+    DAYS, EXTREMES, WEEK_TYPES, WEEKDAYS,
+)
+from periods import period_extremes, rollup_extremes, with_timestamps
+from profiling import stage
+from sessions import SESSIONS, session_codes
+from weekly import WEEK_START
+
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV = "nq.csv"    # your data file in UTC
+INPUT_CSV = sys.argv[1] if len(sys.argv) > 1 else "nq.csv"    # your data file in UTC
 DATE_COL  = "DateTime"
 DELIM     = ";"               # semicolon‐delimited
-
-# session definitions in EST
-SESSIONS = {
-    "Asia"               : ("19:00", "22:00"),
-    "London"             : ("00:00", "05:00"),
-    "New York Morning"   : ("09:30", "12:00"),
-    "New York Afternoon": ("12:00", "16:00"),
-}
-
-def session_of(ts_eastern):
-    """Map an Eastern‐tz Timestamp to session name or 'Other'."""
-    t = ts_eastern.time()
-    for name, (start, end) in SESSIONS.items():
-        if pd.to_datetime(start).time() <= t < pd.to_datetime(end).time():
-            return name
-    return "Other"
-
-# ── 1. LOAD & TIMEZONE ADJUST ────────────────────────────────────────────────
-df = pd.read_csv(
-    INPUT_CSV,
-    sep=DELIM,
-    header=None,
-    names=[DATE_COL, "Open", "High", "Low", "Close", "Volume"],
-    parse_dates=[DATE_COL],
-    date_parser=lambda s: pd.to_datetime(s, format="%Y%m%d %H%M%S"),
-)
-
-df[DATE_COL] = (
-    df[DATE_COL]
-      .dt.tz_localize("UTC")
-      .dt.tz_convert("America/New_York")
-)
-
-df = df.set_index(DATE_COL).sort_index()
-
-# ── 2. WEEKLY AGGREGATION ────────────────────────────────────────────────────
-def summarize_week(w):
-    open_price  = w["Open"].iloc[0]
-    close_price = w["Close"].iloc[-1]
-    bullish     = close_price > open_price
-
-    low_ts  = w["Low"].idxmin()
-    high_ts = w["High"].idxmax()
-
-    return pd.Series({
-        "Bullish"       : bullish,
-        "Low_Weekday"   : low_ts.day_name(),
-        "Low_Session"   : session_of(low_ts),
-        "Low_Hour"      : low_ts.hour,
-        "High_Weekday"  : high_ts.day_name(),
-        "High_Session"  : session_of(high_ts),
-        "High_Hour"     : high_ts.hour,
-    })
-
-weekly = df.groupby(df.index.to_period("W-MON"), group_keys=False)\
-           .apply(summarize_week)
-
-# ── 3. PRINT DISTRIBUTIONS ──────────────────────────────────────────────────
-def print_joint(col_day, col_sess, title, mask):
-    ct = pd.crosstab(
-        weekly.loc[mask, col_day],
-        weekly.loc[mask, col_sess],
-        normalize=True
-    ).mul(100).round(2)
+TZ        = "America/New_York"
+CHUNK_ROWS = None             # e.g. 2_000_000 to stream huge files in chunks
+COMPACT    = False            # float32 prices / uint32 volume: 28 vs 48 bytes per bar (~1.7x)
+COUNTS_OUT = "weekly_session_counts.npz"   # mergeable weekday × session × hour counts
+CI_OUT     = "weekly_session_ci.csv"       # bootstrap CIs per weekday × session cell
+# session definitions (EST) live in sessions.SESSIONS, shared with sp500.py
+# ─────────────────────────────────────────────────────────────────────────────
+
+# ── 1. LOAD & TAG (timestamps stay int64 UTC; Eastern fields are derived) ───
+def load_tagged(path):
+    """Bars sorted by time, each tagged with its Eastern week and session."""
+    df = load_bars(path, delim=DELIM, compact=COMPACT).rename(columns={"DateTime": DATE_COL})
+    df = df.sort_values(DATE_COL, kind="stable", ignore_index=True)
+    day, minute = day_minute(df[DATE_COL], TZ)
+    df["Week"] = period_ordinals(day, WEEK_START)
+
+    # tag every bar with its session in one lookup (sessions may wrap midnight)
+    codes, labels = session_codes(minute, SESSIONS)
+    df["Session"] = pd.Categorical.from_codes(codes, categories=labels)
+    return df
+
+# ── 2. WEEKLY AGGREGATION → CONTINGENCY COUNTS ──────────────────────────────
+def summarize_weeks(df):
+    """Count store of weekly lows/highs from bars already loaded in memory."""
+    ext = period_extremes(df["Week"], df["Open"], df["High"], df["Low"], df["Close"])
+    ts = as_ns(df[DATE_COL])
+    session = df["Session"].cat.codes.to_numpy()
+    return count_extremes(
+        ext["Close"] > ext["Open"],
+        ts[ext["Low_Pos"]], ts[ext["High_Pos"]], SESSIONS,
+        low_session=session[ext["Low_Pos"]], high_session=session[ext["High_Pos"]], tz=TZ,
+    )
+
+def stream_weeks(path, chunk_rows):
+    """
+    Count store from a file read `chunk_rows` bars at a time. Each chunk is
+    reduced to partial weeks which are folded into the running per-week
+    accumulators, so a week split across chunks is merged correctly and
+    memory stays bounded by the chunk size.
+    """
+    weeks = None
+    for chunk in iter_bars(path, delim=DELIM, chunk_rows=chunk_rows, compact=COMPACT):
+        chunk = chunk.sort_values("DateTime", kind="stable")
+        ts = as_ns(chunk["DateTime"])
+        day, _ = day_minute(ts, TZ)
+        ext = period_extremes(
+            period_ordinals(day, WEEK_START),
+            chunk["Open"], chunk["High"], chunk["Low"], chunk["Close"],
+        )
+        part = with_timestamps(ext, ts)
+        if weeks is not None:
+            part = pd.concat([weeks, part])
+            part = rollup_extremes(part, part.index)
+        weeks = part
+
+    return count_extremes(
+        weeks["Close"] > weeks["Open"], weeks["Low_TS"], weeks["High_TS"], SESSIONS, tz=TZ,
+    )
+
+if CHUNK_ROWS:
+    with stage("1-2. stream weeks → counts"):
+        store = stream_weeks(INPUT_CSV, CHUNK_ROWS)
+else:
+    with stage("1. load & tag") as st:
+        bars = load_tagged(INPUT_CSV)
+        st.rows_out = len(bars)
+    with stage("2. weekly counts", rows_in=len(bars)):
+        store = summarize_weeks(bars)
+save_counts(COUNTS_OUT, store)
+
+# ── 3. PRINT DISTRIBUTIONS (sliced from the count store) ─────────────────────
+def print_joint(extreme, title, week_type):
+    ct = weekday_session_counts(store, week_type, extreme)
+    ct = ct.loc[:, ct.sum() > 0].sort_index(axis=1)
+    ct = (ct / ct.to_numpy().sum()).mul(100).round(2)
+    ct.index.name, ct.columns.name = f"{extreme}_Weekday", f"{extreme}_Session"
     print(f"\n=== {title} (in % of these weeks) ===")
-    print(ct.reindex(
-        ["Monday","Tuesday","Wednesday","Thursday","Friday"], 
-        fill_value=0
-    ).to_string())
+    print(ct.reindex(DAYS, fill_value=0).to_string())
 
-def print_hour(col_hour, title, mask):
-    vc = weekly.loc[mask, col_hour].value_counts(normalize=True)\
-             .mul(100).sort_index().round(2)
+def print_hour(extreme, title, week_type):
+    vc = hour_counts(store, week_type, extreme)
+    vc = (vc[vc > 0] / vc.sum()).mul(100).round(2)
+    vc.index.name = f"{extreme}_Hour"
     print(f"\n=== {title} (hour of day, in % of these weeks) ===")
     print(vc.to_string())
 
-for week_type, label in [(True, "Bullish"), (False, "Bearish")]:
-    mask = weekly["Bullish"] == week_type
-
+for label in WEEK_TYPES:
     # Lows
-    print_joint("Low_Weekday", "Low_Session", f"Low-of-Week sessions for {label} weeks", mask)
-    print_hour ("Low_Hour",    f"Low-of-Week hours for {label} weeks",    mask)
+    print_joint("Low", f"Low-of-Week sessions for {label} weeks", label)
+    print_hour ("Low", f"Low-of-Week hours for {label} weeks",    label)
 
     # Highs
-    print_joint("High_Weekday", "High_Session", f"High-of-Week sessions for {label} weeks", mask)
-    print_hour ("High_Hour",     f"High-of-Week hours for {label} weeks",     mask)
-
-# ── 4. (Optional) SAVE to CSV ────────────────────────────────────────────────
-# You can store the joint distributions in CSVs if desired.
+    print_joint("High", f"High-of-Week sessions for {label} weeks", label)
+    print_hour ("High", f"High-of-Week hours for {label} weeks",     label)
+
+# ── 4. BOOTSTRAP CIs per weekday × session cell (+ shuffled-calendar null) ───
+cells = [f"{d} / {s}" for d in WEEKDAYS for s in store["sessions"]]
+with stage("4. bootstrap CIs") as st:
+    ci = pd.concat([
+        bootstrap_table(
+            np.stack([weekday_session_counts(store, wb, extreme).to_numpy().ravel()
+                      for wb in WEEK_TYPES]),
+            WEEK_TYPES, cells,
+        ).assign(Extreme=extreme)
+        for extreme in EXTREMES
+    ], ignore_index=True)
+    ci.to_csv(CI_OUT, index=False)
+    st.rows_out = len(ci)
+print(f"\nSaved → {CI_OUT}")
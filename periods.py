@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+
+def segment_starts(key):
+    """Start offset of every run of equal values in an already-grouped key array."""
+    key = np.asarray(key)
+    if len(key) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+
+
+def _first_where(mask, starts, n):
+    """Position of the first True inside each segment (-1 if there is none)."""
+    pos = np.minimum.reduceat(np.where(mask, np.arange(n), n), starts)
+    return np.where(pos < n, pos, -1)
+
+
+def as_prices(a):
+    """Float price array; compact float32 columns stay float32, anything else becomes float64."""
+    a = np.asarray(a)
+    return a if a.dtype in (np.float32, np.float64) else a.astype(np.float64)
+
+
+def period_extremes(key, open_, high, low, close):
+    """
+    Open/High/Low/Close per period plus where the high and low were printed.
+
+    `key` is any sortable per-bar period label (e.g. Period ordinals). Rows are
+    grouped exactly like `groupby(key)`: periods come out in key order, bars
+    keep their original order inside a period, and ties resolve to the first
+    bar, as `idxmax`/`idxmin` do. All reductions are segment reductions over
+    the whole array, so there is no per-period Python call.
+
+    Returns a DataFrame indexed by key with Open, High, Low, Close and the
+    positional indices Open_Pos, Close_Pos, High_Pos, Low_Pos into the inputs.
+    """
+    key   = np.asarray(key)
+    open_ = as_prices(open_)
+    high  = as_prices(high)
+    low   = as_prices(low)
+    close = as_prices(close)
+    n = len(key)
+
+    order = np.arange(n)
+    if n and (key[1:] < key[:-1]).any():
+        order = np.argsort(key, kind="stable")
+        key, open_, high, low, close = (a[order] for a in (key, open_, high, low, close))
+
+    starts = segment_starts(key)
+    if len(starts) == 0:
+        cols = ["Open", "High", "Low", "Close", "Open_Pos", "Close_Pos", "High_Pos", "Low_Pos"]
+        return pd.DataFrame(columns=cols, index=pd.Index(key, name="Key"))
+    ends   = np.r_[starts[1:], n] - 1
+    seg    = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    hi = np.fmax.reduceat(high, starts)
+    lo = np.fmin.reduceat(low,  starts)
+    hi_pos = _first_where(high == hi[seg], starts, n)
+    lo_pos = _first_where(low  == lo[seg], starts, n)
+
+    return pd.DataFrame(
+        {
+            "Open"      : open_[starts],
+            "High"      : hi,
+            "Low"       : lo,
+            "Close"     : close[ends],
+            "Open_Pos"  : order[starts],
+            "Close_Pos" : order[ends],
+            "High_Pos"  : np.where(hi_pos >= 0, order[hi_pos], -1),
+            "Low_Pos"   : np.where(lo_pos >= 0, order[lo_pos], -1),
+        },
+        index=pd.Index(key[starts], name="Key"),
+    )
+
+
+TS_COLUMNS = ["Open_TS", "Close_TS", "High_TS", "Low_TS"]
+_TS_MAX = np.iinfo(np.int64).max
+
+
+def with_timestamps(ext, ts):
+    """
+    Swap the positional columns of a `period_extremes` frame for int64
+    timestamps taken from `ts`, so partial summaries from different arrays
+    (chunks, days, earlier runs) can be combined with `rollup_extremes`.
+    """
+    ts = np.asarray(ts).view(np.int64)
+    out = ext[["Open", "High", "Low", "Close"]].copy()
+    for col in TS_COLUMNS:
+        out[col] = ts[ext[col.replace("_TS", "_Pos")].to_numpy()]
+    return out
+
+
+def rollup_extremes(summary, key):
+    """
+    Combine timestamped partial summaries into one row per `key`.
+
+    The open comes from the earliest part and the close from the latest; the
+    high/low are the extreme over all parts, with the earliest timestamp
+    winning ties. This is what makes e.g. high-of-month the max of its days'
+    highs, or lets a streaming reader fold chunk-level partial weeks into a
+    running weekly table.
+    """
+    key = np.asarray(key)
+    order = np.lexsort((summary["Open_TS"].to_numpy(), key))
+    key = key[order]
+    col = {c: summary[c].to_numpy()[order] for c in summary.columns}
+    n = len(key)
+
+    starts = segment_starts(key)
+    if len(starts) == 0:
+        return summary.iloc[:0].set_axis(pd.Index(key, name="Key"))
+    seg = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    hi = np.fmax.reduceat(col["High"], starts)
+    lo = np.fmin.reduceat(col["Low"],  starts)
+    hi_ts = np.minimum.reduceat(
+        np.where(col["High"] == hi[seg], col["High_TS"], _TS_MAX), starts)
+    lo_ts = np.minimum.reduceat(
+        np.where(col["Low"]  == lo[seg], col["Low_TS"],  _TS_MAX), starts)
+    last = _first_where(
+        col["Close_TS"] == np.maximum.reduceat(col["Close_TS"], starts)[seg], starts, n)
+
+    return pd.DataFrame(
+        {
+            "Open"     : col["Open"][starts],
+            "High"     : hi,
+            "Low"      : lo,
+            "Close"    : col["Close"][last],
+            "Open_TS"  : col["Open_TS"][starts],
+            "Close_TS" : col["Close_TS"][last],
+            "High_TS"  : hi_ts,
+            "Low_TS"   : lo_ts,
+        },
+        index=pd.Index(key[starts], name="Key"),
+    )
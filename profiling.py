@@ -0,0 +1,145 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource             # Unix only
+except ImportError:
+    resource = None
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+ENV_VAR   = "PO3_PROFILE"       # set to 1 to profile every script run
+FLAG      = "--profile"         # …or pass this on the command line
+TRACE_EXT = ".trace.json"       # <script>.trace.json, open in chrome://tracing or Perfetto
+# ─────────────────────────────────────────────────────────────────────────────
+
+ENABLED = bool(os.environ.get(ENV_VAR))
+if FLAG in sys.argv:
+    sys.argv.remove(FLAG)        # keep positional arguments (input file) where scripts expect them
+    ENABLED = True
+    os.environ[ENV_VAR] = "1"    # …and pass it on to worker processes
+
+_events = []
+_t0_ns = time.perf_counter_ns()
+
+
+def enable():
+    """Turn profiling on here and in child processes started from now on."""
+    global ENABLED
+    ENABLED = True
+    os.environ[ENV_VAR] = "1"
+
+
+# ── MEMORY ───────────────────────────────────────────────────────────────────
+def rss_bytes():
+    """
+    Current resident memory in bytes. Without /proc this falls back to the
+    lifetime peak (ru_maxrss: KB on Linux, bytes on macOS), so stage peaks
+    there never drop back; 0 where neither is available (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """Polls resident memory in the background to catch a stage's peak."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = self.peak = rss_bytes()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+# ── STAGES ───────────────────────────────────────────────────────────────────
+class Stage:
+    """Handle yielded by `stage`; set `rows_out` (and `rows_in`) inside the block."""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Time one named pipeline stage: wall and CPU time, rows in/out and the
+    peak resident-memory increase while it ran. A no-op unless profiling is
+    enabled; stages may nest.
+    """
+    rec = Stage(name, rows_in)
+    if not ENABLED:
+        yield rec
+        return
+
+    sampler = RssSampler()
+    sampler.start()
+    wall0, cpu0 = time.perf_counter_ns(), time.process_time_ns()
+    try:
+        yield rec
+    finally:
+        wall, cpu = time.perf_counter_ns() - wall0, time.process_time_ns() - cpu0
+        sampler.stop()
+        _events.append({
+            "name" : name,
+            "cat"  : os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python",
+            "ph"   : "X",
+            "ts"   : (wall0 - _t0_ns) / 1000,
+            "dur"  : wall / 1000,
+            "pid"  : os.getpid(),
+            "tid"  : threading.get_ident(),
+            "args" : {
+                "cpu_ms"       : round(cpu / 1e6, 3),
+                "rows_in"      : rec.rows_in,
+                "rows_out"     : rec.rows_out,
+                "peak_rss_mb"  : round(sampler.peak / 2**20, 1),
+                "rss_delta_mb" : round((sampler.peak - sampler.start_rss) / 2**20, 1),
+            },
+        })
+
+
+# ── OUTPUT ───────────────────────────────────────────────────────────────────
+def default_trace_path():
+    stem = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+    return stem + TRACE_EXT
+
+
+def flush(path=None):
+    """Write the stages recorded so far as a Chrome trace file and start afresh."""
+    if not _events:
+        return None
+    path = path or default_trace_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, indent=1)
+    _events.clear()
+    return path
+
+
+def _flush_at_exit():
+    path = flush()
+    if path:
+        print(f"Saved profile → {path}", file=sys.stderr)
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,244 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import load_bars
+from calendar_fields import as_ns, day_minute, period_ordinals
+from periods import as_prices, segment_starts
+from profiling import stage
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV  = "nq.csv"                   # bars in UTC
+DELIM      = ";"
+TZ         = "America/New_York"         # custom ranges are given in this local time
+BLOCK      = 256                        # in-block table depth: 1 byte per bar and level
+OUTPUT_CSV = "range_extremes.csv"
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _pick(v, a, b):
+    """
+    Per element, the better of positions `a` and `b` (smaller value; on a tie
+    the earlier bar, like `idxmin`). Position -1 means "no candidate".
+    """
+    va = v[np.maximum(a, 0)]
+    vb = v[np.maximum(b, 0)]
+    take_b = (a < 0) | ((b >= 0) & ((vb < va) | ((vb == va) & (b < a))))
+    return np.where(take_b, b, a)
+
+
+class RangeExtremum:
+    """
+    Range argmin (kind="min") or argmax (kind="max") over a value array,
+    answering any batch of [start, stop) ranges in O(1) per range.
+
+    Two sparse tables are built once:
+
+    * an in-block table of levels 0…log2(BLOCK), holding each window's winner
+      as a small offset from its first bar (1 byte per bar and level);
+    * a table over the winners of whole BLOCK-sized blocks.
+
+    A range shorter than 2·BLOCK is two overlapping windows of the in-block
+    table; a longer one is its partial head block, its whole blocks and its
+    partial tail block. NaN never wins; ties resolve to the earliest bar.
+    """
+
+    def __init__(self, values, kind="min", block=BLOCK):
+        block = int(block)
+        if block & (block - 1) or not 1 <= block <= 256:
+            raise ValueError("block must be a power of two no larger than 256")
+        v = as_prices(values)
+        v = -v if kind == "max" else v
+        self.v = np.where(np.isnan(v), np.inf, v)
+        self.kind, self.block = kind, block
+        self.levels = block.bit_length()          # in-block levels 0 … log2(block)
+        n = len(v)
+
+        # in-block table: off[k, i] = winner of [i, i + 2**k) minus i
+        self.off = np.zeros((self.levels, n), dtype=np.uint8)
+        for k in range(1, self.levels):
+            h, m = 1 << (k - 1), n - (1 << k) + 1
+            if m <= 0:
+                break
+            i = np.arange(m)
+            win = _pick(self.v, i + self.off[k - 1, :m], i + h + self.off[k - 1, h:h + m])
+            self.off[k, :m] = win - i
+
+        # block table: pos[k, j] = winner of blocks [j, j + 2**k)
+        nb = n // block
+        self.blocks = [np.arange(nb) * block + self.off[self.levels - 1, ::block][:nb]]
+        k = 1
+        while (1 << k) <= nb:
+            prev, h = self.blocks[-1], 1 << (k - 1)
+            self.blocks.append(_pick(self.v, prev[:-h], prev[h:]))
+            k += 1
+
+    def _short(self, start, stop):
+        """Winner of ranges no longer than 2·block (-1 where empty)."""
+        length = stop - start
+        ok = length > 0
+        k = np.floor(np.log2(np.maximum(length, 1))).astype(np.intp)
+        s, e = np.where(ok, start, 0), np.where(ok, stop - (1 << k), 0)
+        a = s + self.off[k, s]
+        b = e + self.off[k, e]
+        return np.where(ok, _pick(self.v, a, b), -1)
+
+    def _whole_blocks(self, first, last):
+        """Winner of blocks [first, last) (last > first)."""
+        k = np.floor(np.log2(last - first)).astype(np.intp)
+        out = np.empty(len(first), dtype=np.int64)
+        for level in np.unique(k):
+            sel = k == level
+            tab = self.blocks[level]
+            out[sel] = _pick(self.v, tab[first[sel]], tab[last[sel] - (1 << level)])
+        return out
+
+    def argext(self, start, stop):
+        """Position of the extreme of every [start, stop) range (-1 if empty or all NaN)."""
+        start = np.asarray(start, dtype=np.int64)
+        stop  = np.asarray(stop,  dtype=np.int64)
+        pos = np.full(len(start), -1, dtype=np.int64)
+
+        short = stop - start < 2 * self.block
+        pos[short] = self._short(start[short], stop[short])
+
+        long_ = np.flatnonzero(~short)
+        if len(long_):
+            s, e, b = start[long_], stop[long_], self.block
+            first, last = -(-s // b), e // b
+            head = self._short(s, first * b)
+            tail = self._short(last * b, e)
+            mid = self._whole_blocks(first, last)
+            pos[long_] = _pick(self.v, _pick(self.v, head, mid), tail)
+
+        found = pos >= 0
+        pos[found & np.isinf(self.v[np.maximum(pos, 0)])] = -1
+        return pos
+
+
+# ── RANGES ───────────────────────────────────────────────────────────────────
+def ranges_from_keys(key):
+    """(keys, starts, stops) of every run of a grouped per-bar key (e.g. Period ordinals)."""
+    key = np.asarray(key)
+    starts = segment_starts(key)
+    return key[starts], starts, np.r_[starts[1:], len(key)]
+
+
+def first_days_ranges(day, n_days):
+    """Ranges covering the first `n_days` trading days (days with bars) of every month."""
+    day = np.asarray(day)
+    day_starts = segment_starts(day)
+    month = period_ordinals(day[day_starts], "M")
+    month_first = segment_starts(month)
+    month_end = np.r_[month_first[1:], len(day_starts)]
+    stop_day = np.minimum(month_first + n_days, month_end)
+    return month[month_first], day_starts[month_first], np.r_[day_starts, len(day)][stop_day]
+
+
+def range_extremes(highs, lows, starts, stops, ts, open_=None, close=None):
+    """
+    High/Low (value, bar position and timestamp) of every [start, stop)
+    range from prebuilt `RangeExtremum` indexes; Open/Close are the first
+    and last bar when given.
+    """
+    starts, stops = np.asarray(starts), np.asarray(stops)
+    ts = as_ns(ts)
+    out = {}
+    if open_ is not None:
+        out["Open"] = np.where(stops > starts, np.asarray(open_)[np.minimum(starts, len(ts) - 1)], np.nan)
+    for name, index in [("High", highs), ("Low", lows)]:
+        pos = index.argext(starts, stops)
+        ok = pos >= 0
+        vals = -index.v if index.kind == "max" else index.v
+        out[name] = np.where(ok, vals[np.maximum(pos, 0)], np.nan)
+        out[f"{name}_Pos"] = pos
+        out[f"{name}_TS"] = np.where(ok, ts[np.maximum(pos, 0)], np.iinfo(np.int64).min)
+    if close is not None:
+        out["Close"] = np.where(stops > starts, np.asarray(close)[np.maximum(stops - 1, 0)], np.nan)
+    return pd.DataFrame(out)
+
+
+def local_ranges(ts, bounds, tz=TZ):
+    """
+    Bar positions of local-time (Start, End) bounds: [first bar ≥ Start,
+    first bar ≥ End). A bound inside the spring-forward gap moves to the
+    end of the gap; one in the repeated fall-back hour is ambiguous, so its
+    row gets an empty range. Returns (starts, stops, ambiguous row mask).
+    """
+    ts = as_ns(ts)
+    bad = np.zeros(len(bounds), dtype=bool)
+    pos = []
+    for col in ("Start", "End"):
+        local = pd.DatetimeIndex(pd.to_datetime(bounds[col], format="ISO8601"))
+        utc = local.tz_localize(tz, ambiguous="NaT", nonexistent="shift_forward")
+        bad |= np.asarray(utc.isna()) & ~np.asarray(local.isna())
+        pos.append(np.searchsorted(ts, as_ns(utc)))
+    starts, stops = pos
+    starts[bad] = stops[bad] = 0
+    return starts, stops, bad
+
+
+def _local_times(ts_ns, tz=TZ):
+    return pd.DatetimeIndex(np.asarray(ts_ns).view("M8[ns]")).tz_localize("UTC").tz_convert(tz)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Extremes of custom bar ranges from a sparse-table range index.")
+    ap.add_argument("input", nargs="?", default=INPUT_CSV, help="bars (UTC)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--ranges", help="CSV with Start,End (local time, end exclusive) and optional Label")
+    src.add_argument("--first-days", type=int, metavar="N", help="first N trading days of every month")
+    src.add_argument("--period", help="pandas period freq, e.g. W-MON, M, Q, Y")
+    ap.add_argument("--out", default=OUTPUT_CSV)
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"Input file '{args.input}' not found. Please adjust INPUT_CSV to your filename.")
+        return 1
+
+    with stage("1. load & sort") as st:
+        bars = load_bars(args.input, delim=DELIM).sort_values("DateTime", kind="stable",
+                                                              ignore_index=True)
+        st.rows_out = len(bars)
+    with stage("2. build range index", rows_in=len(bars)):
+        highs = RangeExtremum(bars["High"], "max")
+        lows  = RangeExtremum(bars["Low"],  "min")
+
+    ts = as_ns(bars["DateTime"])
+    if args.ranges:
+        bounds = pd.read_csv(args.ranges)
+        starts, stops, ambiguous = local_ranges(ts, bounds)
+        labels = bounds["Label"] if "Label" in bounds else bounds["Start"].astype(str)
+        for row in np.flatnonzero(ambiguous):
+            print(f"Range {labels[row]!r} (row {row + 1}) has a bound in the repeated "
+                  f"fall-back hour, which is ambiguous in {TZ}; it was left empty.")
+    else:
+        day, _ = day_minute(ts, TZ)
+        if args.first_days:
+            keys, starts, stops = first_days_ranges(day, args.first_days)
+            freq = "M"
+        else:
+            freq = args.period
+            keys, starts, stops = ranges_from_keys(period_ordinals(day, freq))
+        labels = pd.PeriodIndex.from_ordinals(keys, freq=freq).astype(str)
+
+    with stage("3. range queries", rows_in=len(starts)) as st:
+        table = range_extremes(highs, lows, starts, stops, ts, bars["Open"], bars["Close"])
+        st.rows_out = len(table)
+
+    table = table.assign(
+        Range=np.asarray(labels), Bars=stops - starts,
+        High_Time=_local_times(table["High_TS"]), Low_Time=_local_times(table["Low_TS"]),
+    )[["Range", "Bars", "Open", "High", "High_Time", "Low", "Low_Time", "Close"]]
+    table.to_csv(args.out, index=False)
+    print(table.tail(10).to_string(index=False))
+    print(f"\nSaved → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import DAY_NS, load_bars
+from calendar_fields import as_ns, day_minute, period_ordinals, weekday_of
+from counts import DAYS, EXTREMES, WEEK_TYPES
+from periods import period_extremes, segment_starts
+from profiling import stage
+from sessions import SESSIONS, session_codes
+from streaks import inside_outside_flags
+from weekly import WEEK_START, weekly_extremes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV    = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"
+DELIM        = ";"
+TZ           = "America/New_York"             # session/hour of intraday extremes (as london.py)
+WEEK_WINDOWS = [52, 156, "expanding", "year"]  # trailing weeks, all weeks so far, calendar years
+DAY_WINDOWS  = [252, 756, "expanding", "year"] # the same in bars, for the inside/outside rates
+OUTPUT_CSV   = "rolling_distributions.csv"
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# ── CUMULATIVE COUNTS ────────────────────────────────────────────────────────
+def prefix_counts(codes, n_cats, mask=None):
+    """
+    (periods + 1) × categories matrix whose row i holds the category counts
+    of periods [0, i). Periods outside `mask` are counted nowhere.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    prefix = np.zeros((len(codes) + 1, n_cats), dtype=np.int64)
+    rows = np.arange(1, len(codes) + 1)
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        rows, codes = rows[mask], codes[mask]
+    prefix[rows, codes] = 1
+    return np.cumsum(prefix, axis=0, out=prefix)
+
+
+def rolling_counts(prefix, window):
+    """Counts of every trailing `window`-period window (ending at periods window-1 … n-1)."""
+    return prefix[window:] - prefix[:-window]
+
+
+def bucket_counts(prefix, starts):
+    """Counts of the consecutive buckets beginning at sorted period positions `starts`."""
+    bounds = np.r_[starts, len(prefix) - 1]
+    return prefix[bounds[1:]] - prefix[bounds[:-1]]
+
+
+def distributions(periods, codes, categories, windows, mask=None, years=None):
+    """
+    Tidy per-window distributions of `codes` over `categories`: one prefix
+    matrix is built, then every window is the difference of two of its rows.
+
+    `windows` holds trailing window lengths (in periods), "expanding" (all
+    periods so far) and "year" (calendar-year buckets, needs `years`).
+    Period_End labels each window with the last period it covers.
+    """
+    periods = np.asarray(periods)
+    prefix = prefix_counts(codes, len(categories), mask)
+    n = len(periods)
+    parts = []
+    for w in windows:
+        if w == "expanding":
+            counts, ends = prefix[1:], periods
+        elif w == "year":
+            starts = segment_starts(years)
+            counts, ends = bucket_counts(prefix, starts), periods[np.r_[starts[1:], n] - 1]
+        elif w <= n:
+            counts, ends = rolling_counts(prefix, w), periods[w - 1:]
+        else:
+            continue
+        parts.append(tidy(counts, ends, categories).assign(Window=str(w)))
+    return pd.concat(parts, ignore_index=True)
+
+
+def tidy(counts, ends, categories):
+    """Long table: one row per (window end, category) with count, N and %."""
+    n = counts.sum(axis=1, keepdims=True)
+    pct = np.where(n > 0, counts / np.maximum(n, 1) * 100, np.nan).round(2)
+    k = len(categories)
+    return pd.DataFrame({
+        "Period_End" : np.repeat(ends, k),
+        "Category"   : np.tile(np.asarray(categories, dtype=object), len(ends)),
+        "Count"      : counts.ravel(),
+        "N"          : np.repeat(n.ravel(), k),
+        "Pct"        : pct.ravel(),
+    })
+
+
+# ── ANALYSES ─────────────────────────────────────────────────────────────────
+def _week_labels(weeks, week_start=WEEK_START):
+    start = pd.PeriodIndex.from_ordinals(weeks.index, freq=week_start).start_time
+    return start.date, start.year.to_numpy()
+
+
+def weekday_rolling(bars, windows=WEEK_WINDOWS):
+    """Weekday of each week's low/high (as sp500.py reads it), per week type."""
+    weeks = weekly_extremes(bars["DateTime"], bars["Open"], bars["High"], bars["Low"], bars["Close"])
+    ends, years = _week_labels(weeks)
+    bullish = (weeks["Close"] > weeks["Open"]).to_numpy()
+    parts = []
+    for extreme in EXTREMES:
+        day, _ = day_minute(weeks[f"{extreme}_TS"].to_numpy(), tz=None)
+        wd = weekday_of(day)
+        for wb, mask in zip(WEEK_TYPES, [bullish, ~bullish]):
+            # weekend extremes fall outside DAYS and are left out, as in analyse-days.py
+            parts.append(
+                distributions(ends, wd, DAYS, windows, mask & (wd < len(DAYS)), years)
+                .assign(Analysis=f"{extreme}_Weekday", Group=wb)
+            )
+    return pd.concat(parts, ignore_index=True)
+
+
+def session_hour_rolling(bars, windows=WEEK_WINDOWS, sessions=SESSIONS, tz=TZ):
+    """Session and hour (in `tz`) of each week's low/high, per week type."""
+    ts = as_ns(bars["DateTime"])
+    day, _ = day_minute(ts, tz)
+    ext = period_extremes(
+        period_ordinals(day, WEEK_START), bars["Open"], bars["High"], bars["Low"], bars["Close"]
+    )
+    ends, years = _week_labels(ext)
+    bullish = (ext["Close"] > ext["Open"]).to_numpy()
+    parts = []
+    for extreme in EXTREMES:
+        _, minute = day_minute(ts[ext[f"{extreme}_Pos"]], tz)
+        session, labels = session_codes(minute, sessions)
+        for wb, mask in zip(WEEK_TYPES, [bullish, ~bullish]):
+            for name, codes, cats in [("Session", session, labels),
+                                      ("Hour", minute // 60, list(range(24)))]:
+                parts.append(
+                    distributions(ends, codes, cats, windows, mask, years)
+                    .assign(Analysis=f"{extreme}_{name}", Group=wb)
+                )
+    return pd.concat(parts, ignore_index=True)
+
+
+def inside_rolling(bars, windows=DAY_WINDOWS):
+    """Share of inside / outside / other bars (as inside.py flags them)."""
+    inside, outside = inside_outside_flags(bars["High"], bars["Low"])
+    codes = np.where(inside, 0, np.where(outside, 1, 2))[1:]     # first bar has no prior bar
+    dates = bars["DateTime"].to_numpy()[1:]
+    years = dates.astype("M8[Y]").astype(np.int64)
+    return (
+        distributions(pd.DatetimeIndex(dates).date, codes, ["Inside", "Outside", "Neither"],
+                      windows, years=years)
+        .assign(Analysis="Inside_Outside", Group="All")
+    )
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_CSV):
+        print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
+        sys.exit(1)
+
+    # 1. LOAD & SORT
+    with stage("1. load & sort") as st:
+        bars = load_bars(INPUT_CSV, delim=DELIM).sort_values("DateTime", kind="stable",
+                                                             ignore_index=True)
+        st.rows_out = len(bars)
+    intraday = bool((as_ns(bars["DateTime"]) % DAY_NS != 0).any())
+
+    # 2. WEEKDAY OF LOW/HIGH per week type (every data set)
+    with stage("2. weekday windows", rows_in=len(bars)) as st:
+        parts = [weekday_rolling(bars)]
+        st.rows_out = len(parts[-1])
+
+    # 3. SESSION / HOUR of LOW/HIGH (intraday data) or INSIDE/OUTSIDE rates (daily data)
+    if intraday:
+        with stage("3. session/hour windows", rows_in=len(bars)) as st:
+            parts.append(session_hour_rolling(bars))
+            st.rows_out = len(parts[-1])
+    else:
+        with stage("3. inside/outside windows", rows_in=len(bars)) as st:
+            parts.append(inside_rolling(bars))
+            st.rows_out = len(parts[-1])
+
+    # 4. SAVE
+    table = pd.concat(parts, ignore_index=True)
+    table = table[["Analysis", "Group", "Window", "Period_End", "Category", "Count", "N", "Pct"]]
+    table.to_csv(OUTPUT_CSV, index=False)
+
+    # latest window of the shortest trailing length the data covers
+    weekday = table[table["Analysis"].str.endswith("Weekday")]
+    shown = next(str(w) for w in WEEK_WINDOWS if (weekday["Window"] == str(w)).any())
+    latest = weekday[weekday["Window"] == shown].groupby(["Analysis", "Group"]).tail(len(DAYS))
+    print(f"📊 Latest weekday distributions (window: {shown}):")
+    print(latest.pivot_table(index=["Analysis", "Group"], columns="Category", values="Pct")
+          .reindex(columns=DAYS).to_string())
+    print(f"\nSaved → {OUTPUT_CSV}")
@@ -0,0 +1,46 @@
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+OTHER           = "Other"
+
+# session definitions in EST
+SESSIONS = {
+    "Asia"               : ("19:00", "22:00"),
+    "London"             : ("00:00", "05:00"),
+    "New York Morning"   : ("09:30", "12:00"),
+    "New York Afternoon": ("12:00", "16:00"),
+}
+
+
+def minute_of_day(hhmm):
+    """'HH:MM' → minutes after midnight."""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def session_lut(sessions):
+    """
+    Turn a {name: ("HH:MM", "HH:MM")} session dict into a label list and a
+    1440-entry uint8 lookup table (minute of day → index into the labels).
+
+    Sessions are [start, end) in local time; a session whose start is after
+    its end wraps midnight. Where sessions overlap, the one listed first wins.
+    Minutes outside every session map to the trailing 'Other' label.
+    """
+    labels = list(sessions) + [OTHER]
+    lut = np.full(MINUTES_PER_DAY, len(sessions), dtype=np.uint8)
+    for code in reversed(range(len(sessions))):
+        start, end = (minute_of_day(t) for t in sessions[labels[code]])
+        if start <= end:
+            lut[start:end] = code
+        else:
+            lut[start:] = code
+            lut[:end]   = code
+    return labels, lut
+
+
+def session_codes(minutes, sessions):
+    """Session code for every minute-of-day value in `minutes`."""
+    labels, lut = session_lut(sessions)
+    return lut[np.asarray(minutes) % MINUTES_PER_DAY], labels
+
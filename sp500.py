@@ -1,47 +1,57 @@
-import pandas as pd
+import sys
+
+from bars import load_bars
+from counts import count_extremes, save_counts
+from profiling import stage
+from sessions import SESSIONS
+import stage_cache
+from weekly import label_table, results_rows, weekly_extremes
 
 # ── CONFIG ────────────────────────────────────────────────────────────────────
-INPUT_CSV   = "sp500.csv"     # your raw data (semicolon-delimited)
+INPUT_CSV   = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"   # your raw data (semicolon-delimited)
 OUTPUT_CSV  = "results.csv"   # where we’ll write the summary
+COUNTS_OUT  = "weekly_counts.npz"   # weekday × session × hour counts per week type
 DATE_COL    = "date"
 DELIMITER   = ";"
-DATE_FORMAT = "%Y%m%d"        # e.g. 20110110
 WEEK_START  = "W-MON"         # weeks starting on Monday
+COMPACT     = False           # float32 prices / uint32 volume while aggregating
+CODED       = False           # write results.csv with uint8 codes instead of names
+LABELS_OUT  = "results_labels.csv"   # code → name table written next to a coded results.csv
 # ─────────────────────────────────────────────────────────────────────────────
 
-# 1. LOAD your entire dataset
-df = pd.read_csv(
-    INPUT_CSV,
-    sep=DELIMITER,
-    header=None,
-    names=[DATE_COL, "Open", "High", "Low", "Close", "Volume"],
-    parse_dates=[DATE_COL],
-    date_parser=lambda s: pd.to_datetime(s, format=DATE_FORMAT),
+# 1. LOAD your entire dataset (parsed once, then served from the bar cache)
+# 2. TAG with week‐period (weekday names are read off the extreme timestamps)
+# 3. GROUP BY week and compute metrics (one vectorized pass over all weeks)
+#    Each step is a stage-cache node keyed by the input's contents and the
+#    config it reads, so the bars are only loaded when the weeks are stale.
+bars = stage_cache.node(
+    "bars", lambda path: load_bars(path, delim=DELIMITER, compact=COMPACT)
+    .rename(columns={"DateTime": DATE_COL}),
+    stage_cache.source(INPUT_CSV), store=False,
 )
-
-# 2. TAG with week‐period and weekday name
-df[DATE_COL]    = pd.to_datetime(df[DATE_COL])
-df["Week"]      = df[DATE_COL].dt.to_period(WEEK_START)
-df["Weekday"]   = df[DATE_COL].dt.day_name()
-
-# 3. GROUP BY week and compute metrics
-weekly = (
-    df
-    .groupby("Week", group_keys=False)
-    .apply(lambda w: pd.Series({
-        "Week_Start" : w[DATE_COL].dt.to_period(WEEK_START).dt.start_time.dt.date.iloc[0],
-        "Bull_Bear"  : "Bullish" if w["Close"].iloc[-1] > w["Open"].iloc[0] else "Bearish",
-        "High_Day"   : w.loc[w["High"].idxmax(), "Weekday"],
-        "Low_Day"    : w.loc[w["Low"].idxmin(),  "Weekday"],
-    }))
+weeks_node = stage_cache.node(
+    "weekly_extremes", lambda df: weekly_extremes(
+        df[DATE_COL], df["Open"], df["High"], df["Low"], df["Close"], week_start=WEEK_START
+    ), bars,
 )
+with stage("1-3. weekly extremes") as st:
+    weeks  = weeks_node.value
+    weekly = results_rows(weeks, week_start=WEEK_START, coded=CODED)
+    st.rows_out = len(weekly)
 
-# 4. RESET INDEX (turn 'Week' into a column, if you need it)
-weekly.index.name = "Week_Period"
-weekly = weekly.reset_index(drop=True)
+# 4. SAVE just the columns you asked for
+with stage("4. save results", rows_in=len(weekly)):
+    weekly[["Week_Start", "Bull_Bear", "High_Day", "Low_Day"]] \
+        .to_csv(OUTPUT_CSV, index=False)
+    if CODED:
+        label_table().to_csv(LABELS_OUT, index=False)
 
-# 5. SAVE just the columns you asked for
-weekly[["Week_Start", "Bull_Bear", "High_Day", "Low_Day"]] \
-    .to_csv(OUTPUT_CSV, index=False)
+# 5. SAVE the contingency counts analyse-days.py reads its tables from
+with stage("5. save counts", rows_in=len(weeks)):
+    save_counts(COUNTS_OUT, stage_cache.node(
+        "weekly_counts", lambda w: count_extremes(
+            w["Close"] > w["Open"], w["Low_TS"], w["High_TS"], SESSIONS
+        ), weeks_node,
+    ).value)
 
 print(f"Results saved to {OUTPUT_CSV}")
@@ -0,0 +1,223 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+from profiling import stage
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+CACHE_DIR = ".stage_cache"      # in the working directory
+MAX_BYTES = 2 * 2**30           # least recently used entries are evicted beyond this
+CACHE_VER = 1                   # bump when the entry format changes
+ENV_VAR   = "PO3_NO_CACHE"      # set to 1 to recompute every stage
+FLAG      = "--no-cache"        # …or pass this on the command line
+# ─────────────────────────────────────────────────────────────────────────────
+
+ENABLED = not os.environ.get(ENV_VAR)
+if FLAG in sys.argv:
+    sys.argv.remove(FLAG)        # keep positional arguments (input file) where scripts expect them
+    ENABLED = False
+    os.environ[ENV_VAR] = "1"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_SIMPLE = (str, int, float, bool, bytes, type(None))
+
+
+# ── FINGERPRINTS ─────────────────────────────────────────────────────────────
+def _is_local(obj):
+    """Defined in this repository (its code is part of a stage's key), not in a library."""
+    if isinstance(obj, type):
+        path = getattr(sys.modules.get(obj.__module__), "__file__", None)
+    else:
+        path = getattr(getattr(obj, "__code__", None), "co_filename", None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == _HERE
+
+
+def _code_parts(code, glb, seen):
+    """Bytecode, constants and the referenced globals of a code object, recursively."""
+    consts = [_code_parts(c, glb, seen) if isinstance(c, types.CodeType) else _canon(c, seen)
+              for c in code.co_consts]
+    refs = {name: _canon(glb[name], seen) for name in code.co_names if name in glb}
+    return [code.co_code.hex(), consts, list(code.co_names), refs]
+
+
+def _canon(v, seen):
+    """
+    JSON-able stand-in for `v` that changes whenever `v` does: plain values
+    as they are, arrays and frames by a digest of their contents, and
+    repository functions by their code, defaults and the globals they read
+    (config constants such as WEEK_START or SESSIONS included). Decorated
+    functions (lru_cache, wraps) count as the function they wrap; library
+    functions, classes and modules by name. Anything else raises TypeError
+    rather than collapsing to a key that never changes.
+    """
+    if isinstance(v, _SIMPLE):
+        return v.hex() if isinstance(v, bytes) else v
+    if isinstance(v, (list, tuple)):
+        return [_canon(x, seen) for x in v]
+    if isinstance(v, (set, frozenset)):
+        return sorted(map(repr, v))
+    if isinstance(v, dict):
+        return {str(k): _canon(x, seen) for k, x in v.items()}
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, np.dtype) or (isinstance(v, type) and issubclass(v, np.generic)):
+        return np.dtype(v).str
+    if isinstance(v, np.ndarray):
+        return array_digest(v)
+    if isinstance(v, (pd.Series, pd.DataFrame, pd.Index)):
+        return hashlib.sha1(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes()).hexdigest()
+    if isinstance(v, Node):
+        return v.key
+    if callable(v) and hasattr(v, "__wrapped__"):
+        v = inspect.unwrap(v)
+    if isinstance(v, (types.FunctionType, type)) and _is_local(v):
+        name = f"{v.__module__}.{v.__qualname__}"
+        if id(v) in seen:
+            return name
+        seen.add(id(v))
+        if isinstance(v, type):
+            return [name, {k: _canon(x, seen) for k, x in vars(v).items() if _is_local(x)}]
+        cells = [c.cell_contents for c in (v.__closure__ or ())]
+        return [name, _code_parts(v.__code__, v.__globals__, seen),
+                _canon(v.__defaults__, seen), _canon(v.__kwdefaults__, seen), _canon(cells, seen)]
+    if isinstance(v, types.ModuleType):
+        return v.__name__
+    if isinstance(v, (types.FunctionType, types.BuiltinFunctionType, type, np.ufunc)):
+        return f"{getattr(v, '__module__', None) or 'numpy'}.{getattr(v, '__qualname__', v.__name__)}"
+    raise TypeError(f"cannot fingerprint {type(v).__name__} {v!r:.60}; pass plain values, "
+                    f"arrays, frames, functions or nodes")
+
+
+def array_digest(a):
+    a = np.ascontiguousarray(a)
+    if a.dtype.hasobject:
+        return _canon(a.tolist(), set())
+    h = hashlib.sha1(f"{a.dtype.str}{a.shape}".encode())
+    h.update(a.view(np.uint8).ravel() if a.size else b"")
+    return h.hexdigest()
+
+
+def fingerprint(*parts):
+    """Hex key of any mix of config values, arrays, frames, functions and nodes."""
+    blob = json.dumps([CACHE_VER, pd.__version__, np.__version__, _canon(list(parts), set())],
+                      sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:20]
+
+
+# ── STORE ────────────────────────────────────────────────────────────────────
+def _entry(name, key, cache_dir):
+    return os.path.join(cache_dir, f"{name}-{key}.pkl")
+
+
+def _read(path):
+    """Cached value at `path` (and mark it recently used), or None on a miss."""
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+        os.utime(path)
+        return value
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def _write(path, value, cache_dir, max_bytes):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        evict(cache_dir, max_bytes)
+    except OSError:
+        pass        # read-only location: just skip caching
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Delete least recently used entries until the directory fits `max_bytes`."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".pkl"):
+            st = entry.stat()
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# ── NODES ────────────────────────────────────────────────────────────────────
+class Node:
+    """
+    One pipeline stage. Its key is known as soon as the node is built; its
+    value is read from the cache, or computed (pulling in the upstream
+    values it needs) only when asked for.
+    """
+
+    def __init__(self, name, key, compute, store=True, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.name, self.key = name, key
+        self._compute, self.store = compute, store
+        self.cache_dir, self.max_bytes = cache_dir, max_bytes
+        self.hit = None
+
+    @property
+    def value(self):
+        if not hasattr(self, "_value"):
+            path = _entry(self.name, self.key, self.cache_dir)
+            cached = _read(path) if ENABLED and self.store else None
+            self.hit = cached is not None
+            state = "hit" if self.hit else "miss" if ENABLED and self.store else "run"
+            with stage(f"cache {self.name}: {state}"):
+                if self.hit:
+                    self._value = cached[0]
+                else:
+                    self._value = self._compute()
+                    if ENABLED and self.store:
+                        _write(path, (self._value,), self.cache_dir, self.max_bytes)
+        return self._value
+
+
+def node(name, fn, *deps, store=True, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """
+    Stage `name` = fn(*deps). Nodes among `deps` contribute their key and,
+    when the stage has to run, their value; anything else is fingerprinted
+    by content. The key also covers `fn` itself, so editing its code or a
+    config constant it reads invalidates this stage and everything built on
+    it. `store=False` keeps the stage in the chain without writing its value
+    (e.g. raw bars, which the bar cache already serves).
+    """
+    key = fingerprint(name, fn, *deps)
+    return Node(name, key, lambda: fn(*(d.value if isinstance(d, Node) else d for d in deps)),
+                store, cache_dir, max_bytes)
+
+
+def file_digest(path, cache_dir=CACHE_DIR):
+    """Content hash of a file, re-read only when its size or mtime changes."""
+    st = os.stat(path)
+    memo = _entry("file", fingerprint(os.path.abspath(path), st.st_size, st.st_mtime_ns), cache_dir)
+    digest = _read(memo) if ENABLED else None
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = (h.hexdigest(),)
+        if ENABLED:
+            _write(memo, digest, cache_dir, MAX_BYTES)
+    return digest[0]
+
+
+def source(path, cache_dir=CACHE_DIR):
+    """Input-file node: keyed by the file's contents, its value is the path."""
+    return Node("source", file_digest(path, cache_dir), lambda: path, store=False)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from periods import as_prices
+
+
+def inside_outside_flags(high, low):
+    """
+    Inside (High ≤ prev High and Low ≥ prev Low) and outside (High > prev High
+    and Low < prev Low) flags for every bar; the first bar is neither.
+    """
+    high = as_prices(high)
+    low  = as_prices(low)
+    inside  = np.zeros(len(high), dtype=bool)
+    outside = np.zeros(len(high), dtype=bool)
+    inside[1:]  = (high[1:] <= high[:-1]) & (low[1:] >= low[:-1])
+    outside[1:] = (high[1:] >  high[:-1]) & (low[1:] <  low[:-1])
+    return inside, outside
+
+
+def run_lengths(flag):
+    """Length of every maximal run of consecutive True values, in order."""
+    f = np.asarray(flag, dtype=bool).astype(np.int8)
+    edges = np.diff(np.r_[np.int8(0), f, np.int8(0)])
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def streak_histogram(flag):
+    """hist[L] = number of maximal True runs of exactly length L (hist[0] == 0)."""
+    return np.bincount(run_lengths(flag), minlength=1)
+
+
+def window_counts(hist):
+    """
+    Number of length-N windows that are entirely True, for every N at once.
+
+    A run of length L contains L-N+1 such windows for each N ≤ L, so with
+    suffix sums C1[N] = Σ_{L≥N} hist[L] and C2[N] = Σ_{L≥N} L·hist[L] the
+    count is C2[N] - (N-1)·C1[N]. Index 0 is unused and set to 0.
+    """
+    hist = np.asarray(hist, dtype=np.int64)
+    lengths = np.arange(len(hist), dtype=np.int64)
+    c1 = np.cumsum(hist[::-1])[::-1]
+    c2 = np.cumsum((lengths * hist)[::-1])[::-1]
+    counts = c2 - (lengths - 1) * c1
+    counts[0] = 0
+    return counts
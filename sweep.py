@@ -0,0 +1,187 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from bars import PRICES, load_bars
+from calendar_fields import DAY_NS, MIN_NS, WEEKDAYS, to_local_ns, period_ordinals, weekday_of
+from counts import EXTREMES, WEEK_TYPES
+from daily import trading_days
+from periods import as_prices, period_extremes
+from profiling import stage
+from sessions import MINUTES_PER_DAY, SESSIONS, minute_of_day, session_codes
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV      = sys.argv[1] if len(sys.argv) > 1 else "nq.csv"   # bars in UTC
+DELIM          = ";"
+TZ             = "America/New_York"
+WEEK_ANCHORS   = ["W-MON", "W-FRI", "W-SUN"]   # pandas weekly freqs (week ends on that day)
+DAY_ROLLS      = ["00:00", "18:00"]            # trading-day start before weeks are cut
+SESSION_SHIFTS = [-60, -30, 0, 30, 60]         # minutes added to each session's start/end
+WORKERS        = os.cpu_count()
+OUTPUT_CSV     = "sweep_distributions.csv"
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# ── CONFIGURATIONS ───────────────────────────────────────────────────────────
+def _shift(hhmm, minutes):
+    m = (minute_of_day(hhmm) + minutes) % MINUTES_PER_DAY
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def session_variants(base=SESSIONS, shifts=SESSION_SHIFTS):
+    """
+    `base` plus every variant that moves one session's start and/or end by
+    one of `shifts` minutes: [(name, sessions), …].
+    """
+    variants = [("base", dict(base))]
+    for name, (start, end) in base.items():
+        for ds, de in product(shifts, shifts):
+            if ds == de == 0:
+                continue
+            sessions = dict(base)
+            sessions[name] = (_shift(start, ds), _shift(end, de))
+            variants.append((f"{name} {ds:+d}/{de:+d}", sessions))
+    return variants
+
+
+# ── SHARED BARS ──────────────────────────────────────────────────────────────
+def share_arrays(arrays):
+    """
+    Copy each array into its own shared-memory block once. Returns the
+    blocks (keep them alive, then close/unlink) and a picklable spec that
+    workers pass to `attach_arrays`.
+    """
+    blocks, spec = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.dtype.str, arr.shape)
+    return blocks, spec
+
+
+def attach_arrays(spec):
+    """Zero-copy, read-only views of the blocks described by `spec`."""
+    blocks, views = [], {}
+    for name, (shm_name, dtype, shape) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        view.flags.writeable = False
+        blocks.append(shm)
+        views[name] = view
+    return blocks, views
+
+
+_shared = {}
+
+
+def _init_worker(spec):
+    _shared["blocks"], _shared["bars"] = attach_arrays(spec)
+
+
+# ── ONE (ANCHOR, ROLL) CELL, ALL SESSION VARIANTS ────────────────────────────
+def _table(counts, categories, **labels):
+    """Tidy week type × category counts with N and % per week type."""
+    n = counts.sum(axis=1, keepdims=True)
+    pct = (counts / np.maximum(n, 1) * 100).round(2)
+    k = len(categories)
+    return pd.DataFrame({
+        **labels,
+        "Week_Type" : np.repeat(WEEK_TYPES, k),
+        "Category"  : np.tile(np.asarray(categories, dtype=object), len(WEEK_TYPES)),
+        "Count"     : counts.ravel(),
+        "N"         : np.repeat(n.ravel(), k),
+        "Pct"       : pct.ravel(),
+    })
+
+
+def sweep_cell(anchor, roll, variants):
+    """
+    Weekly extremes for one week anchor and day roll (one segment reduction
+    over the shared bars), then the weekday table once and the session table
+    for every session variant — only the extreme bars are re-tagged.
+    """
+    bars = _shared["bars"]
+    local = bars["local"]
+    day = trading_days(local, roll)
+    ext = period_extremes(period_ordinals(day, anchor),
+                          bars["Open"], bars["High"], bars["Low"], bars["Close"])
+    wt = np.where((ext["Close"] > ext["Open"]).to_numpy(), 0, 1)
+    cell = {"Week_Anchor": anchor, "Day_Roll": roll}
+
+    parts = []
+    for extreme in EXTREMES:
+        pos = ext[f"{extreme}_Pos"].to_numpy()
+        wd = weekday_of(day[pos])
+        counts = np.zeros((len(WEEK_TYPES), len(WEEKDAYS)), dtype=np.int64)
+        np.add.at(counts, (wt, wd), 1)
+        parts.append(_table(counts, WEEKDAYS, **cell, Sessions="any", Extreme=extreme,
+                            Axis="Weekday"))
+
+        minute = local[pos] % DAY_NS // MIN_NS
+        for name, sessions in variants:
+            codes, labels = session_codes(minute, sessions)
+            counts = np.zeros((len(WEEK_TYPES), len(labels)), dtype=np.int64)
+            np.add.at(counts, (wt, codes), 1)
+            parts.append(_table(counts, labels, **cell, Sessions=name, Extreme=extreme,
+                                Axis="Session"))
+    return pd.concat(parts, ignore_index=True)
+
+
+def run_sweep(spec, anchors=WEEK_ANCHORS, rolls=DAY_ROLLS, variants=None, workers=WORKERS):
+    """Every (anchor, roll) cell on a pool whose workers attach to the shared bars."""
+    variants = session_variants() if variants is None else variants
+    cells = list(product(anchors, rolls))
+    if workers <= 1:
+        _init_worker(spec)
+        return [sweep_cell(a, r, variants) for a, r in cells]
+    with ProcessPoolExecutor(max_workers=min(workers, len(cells)),
+                             initializer=_init_worker, initargs=(spec,)) as pool:
+        futures = [pool.submit(sweep_cell, a, r, variants) for a, r in cells]
+        return [f.result() for f in futures]
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_CSV):
+        print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
+        sys.exit(1)
+
+    # 1. LOAD, SORT & TAG once (local wall-clock ns carries every calendar field)
+    with stage("1. load & tag") as st:
+        bars = load_bars(INPUT_CSV, delim=DELIM).sort_values("DateTime", kind="stable",
+                                                             ignore_index=True)
+        arrays = {"local": to_local_ns(bars["DateTime"], TZ)}
+        arrays.update({c: as_prices(bars[c]) for c in PRICES})
+        st.rows_out = len(bars)
+    del bars
+
+    # 2. SHARE the arrays and fan the configurations out to the pool
+    variants = session_variants()
+    blocks, spec = share_arrays(arrays)
+    del arrays
+    try:
+        with stage("2. sweep") as st:
+            table = pd.concat(run_sweep(spec, variants=variants), ignore_index=True)
+            st.rows_out = len(table)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    # 3. SAVE + how much the weekday-of-low moves with anchor / roll
+    table.to_csv(OUTPUT_CSV, index=False)
+    n_configs = len(WEEK_ANCHORS) * len(DAY_ROLLS) * len(variants)
+    print(f"Swept {n_configs} configurations "
+          f"({len(WEEK_ANCHORS)} anchors × {len(DAY_ROLLS)} day rolls × {len(variants)} session sets)")
+    low = table[(table["Axis"] == "Weekday") & (table["Extreme"] == "Low")]
+    spread = low.pivot_table(index=["Week_Type", "Category"], columns=["Week_Anchor", "Day_Roll"],
+                             values="Pct").reindex(WEEKDAYS, level="Category")
+    print("\n📊 Low-of-week weekday % by week anchor / day roll:")
+    print(spread.to_string())
+    print(f"\nSaved → {OUTPUT_CSV}")
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bars import load_bars
+from calendar_fields import as_ns, day_minute, period_ordinals
+from periods import period_extremes, rollup_extremes, with_timestamps
+from profiling import stage
+import stage_cache
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_CSV  = sys.argv[1] if len(sys.argv) > 1 else "sp500.csv"
+DELIM      = ";"
+TZ         = "America/New_York"       # bars are stored in UTC
+OUTPUT_CSV = "timeframe_extremes.csv"
+
+# timeframe → (pandas period freq, timeframe it is rolled up from)
+TIMEFRAMES = {
+    "Day"     : ("D",     None),
+    "Week"    : ("W-MON", "Day"),
+    "Month"   : ("M",     "Day"),
+    "Quarter" : ("Q",     "Month"),
+    "Year"    : ("Y",     "Quarter"),
+}
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def load_local(path, delim=DELIM, tz=TZ):
+    """Bars sorted by their UTC `DateTime`, tagged with the local day number `Day` in `tz`."""
+    df = load_bars(path, delim=delim).sort_values("DateTime", kind="stable", ignore_index=True)
+    df["Day"], _ = day_minute(df["DateTime"], tz)
+    return df
+
+
+def cached_timeframes(path, delim=DELIM, tz=TZ):
+    """
+    `build_timeframes(load_local(path))` as a stage-cache node: the bars are
+    only loaded and tagged when no frames are cached for this input's
+    contents, `delim`, `tz` and the code that builds them.
+    """
+    bars = stage_cache.node("local_bars", load_local, stage_cache.source(path), delim, tz,
+                            store=False)
+    return stage_cache.node("timeframes", build_timeframes, bars)
+
+
+def to_local(ns, tz=TZ):
+    """int64 UTC nanoseconds → tz-aware DatetimeIndex."""
+    return pd.DatetimeIndex(np.asarray(ns).view("M8[ns]")).tz_localize("UTC").tz_convert(tz)
+
+
+def build_timeframes(df, timeframes=TIMEFRAMES):
+    """
+    Every timeframe's OHLC summary from one pass over the bars.
+
+    Bars are reduced to days once; each higher timeframe is then rolled up
+    from the level listed as its source (days → weeks, days → months →
+    quarters → years), carrying the High_TS/Low_TS of the winning child row
+    along, so high-of-month is simply the max of its days' highs.
+
+    `df` is the output of `load_local`: bars keyed by local `Day`, with the
+    UTC `DateTime` kept for the *_TS columns.
+
+    Returns {name: frame} with Open/High/Low/Close and int64 UTC *_TS
+    columns, indexed by a PeriodIndex of that timeframe.
+    """
+    out = {}
+    for name, (freq, source) in timeframes.items():
+        if source is None:
+            key = period_ordinals(df["Day"], freq)
+            ext = period_extremes(key, df["Open"], df["High"], df["Low"], df["Close"])
+            frame = with_timestamps(ext, as_ns(df["DateTime"]))
+        else:
+            child = out[source]
+            frame = rollup_extremes(child, child.index.asfreq(freq).asi8)
+        frame.index = pd.PeriodIndex.from_ordinals(frame.index, freq=freq)
+        out[name] = frame
+    return out
+
+
+def extreme_timing(frames, tz=TZ):
+    """Tidy table: one row per period of every timeframe with its extreme times."""
+    parts = []
+    for name, frame in frames.items():
+        parts.append(pd.DataFrame({
+            "Timeframe" : name,
+            "Period"    : frame.index.astype(str),
+            "Bull_Bear" : np.where(frame["Close"] > frame["Open"], "Bullish", "Bearish"),
+            "High_TS"   : to_local(frame["High_TS"], tz),
+            "Low_TS"    : to_local(frame["Low_TS"], tz),
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_CSV):
+        print(f"Input file '{INPUT_CSV}' not found. Please adjust INPUT_CSV to your filename.")
+        sys.exit(1)
+
+    with stage("load + calendar") as st:
+        bars = load_local(INPUT_CSV)
+        st.rows_out = len(bars)
+    with stage("timeframe rollups", rows_in=len(bars)) as st:
+        frames = build_timeframes(bars)
+        st.rows_out = sum(len(f) for f in frames.values())
+    with stage("save extreme timing"):
+        table = extreme_timing(frames)
+        table.to_csv(OUTPUT_CSV, index=False)
+    for name, frame in frames.items():
+        print(f"  {name:<8} {len(frame):>7} periods")
+    print(f"\nSaved → {OUTPUT_CSV}")
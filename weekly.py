@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from calendar_fields import WEEKDAYS, as_ns, day_minute, period_ordinals, weekday_of
+from periods import period_extremes, with_timestamps
+
+WEEK_START = "W-MON"
+DAYS       = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+WEEK_TYPES = ["Bullish", "Bearish"]
+
+# label table of every coded `results.csv` column (code = position in the list)
+LABELS = {
+    "Bull_Bear" : WEEK_TYPES,
+    "High_Day"  : WEEKDAYS,
+    "Low_Day"   : WEEKDAYS,
+}
+
+
+def weekly_extremes(dates, open_, high, low, close, week_start=WEEK_START):
+    """
+    Timestamped weekly summary (Open/High/Low/Close + *_TS, see
+    `periods.with_timestamps`) indexed by week Period ordinal.
+    """
+    ns = as_ns(dates)
+    day, _ = day_minute(ns, tz=None)
+    ext = period_extremes(period_ordinals(day, week_start), open_, high, low, close)
+    return with_timestamps(ext, ns)
+
+
+def results_rows(weeks, week_start=WEEK_START, coded=False):
+    """
+    The `results.csv` rows (Week_Start, Bull_Bear, High_Day, Low_Day) of a
+    weekly summary. With `coded=True` the last three columns are uint8 codes
+    into `LABELS` instead of strings.
+    """
+    def day_code(col):
+        day, _ = day_minute(weeks[col].to_numpy(), tz=None)
+        return weekday_of(day)
+
+    rows = pd.DataFrame({
+        "Week_Start" : pd.PeriodIndex.from_ordinals(weeks.index, freq=week_start).start_time.date,
+        "Bull_Bear"  : np.where(weeks["Close"] > weeks["Open"], 0, 1).astype(np.uint8),
+        "High_Day"   : day_code("High_TS"),
+        "Low_Day"    : day_code("Low_TS"),
+    })
+    return rows if coded else decode_results(rows)
+
+
+def decode_results(rows):
+    """Swap the uint8 code columns of a results frame for their labels (no-op if already labelled)."""
+    rows = rows.copy()
+    for col, labels in LABELS.items():
+        if col in rows and rows[col].dtype.kind in "iu":
+            rows[col] = np.take(labels, rows[col].to_numpy())
+    return rows
+
+
+def label_table():
+    """Tidy (Column, Code, Label) table to ship alongside a coded `results.csv`."""
+    return pd.DataFrame(
+        [(col, code, lab) for col, labels in LABELS.items() for code, lab in enumerate(labels)],
+        columns=["Column", "Code", "Label"],
+    )